@@ -2,36 +2,159 @@
 
 from __future__ import annotations
 
-from bzutech import BzuTech
+import asyncio
+import json
 
+import voluptuous as vol
+
+from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_TYPE, DOMAIN
+from .api import async_get_client
+from .config_flow import (
+    async_import_ports,
+    build_port_entry,
+    configured_ports,
+    parse_targets,
+    resolve_targets,
+)
+from .const import CONF_TARGETS, CONF_TYPE, DOMAIN
+from .outbound import LANE_ALERT, async_get_outbound
+from .profiler import FORMAT_COLLAPSED, FORMAT_PSTATS, PROFILER
 
 PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SERVICE_PROFILE = "profile"
+SERVICE_PROVISION = "provision"
+SERVICE_ALERT = "alert"
+CONF_DURATION = "duration"
+CONF_FORMAT = "format"
+CONF_TOPIC = "topic"
+CONF_PAYLOAD = "payload"
+
+SERVICE_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=3600)
+        ),
+        vol.Optional(CONF_FORMAT, default=FORMAT_COLLAPSED): vol.In(
+            [FORMAT_COLLAPSED, FORMAT_PSTATS]
+        ),
+    }
+)
+
+SERVICE_PROVISION_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_EMAIL): cv.string,
+        vol.Required(CONF_TARGETS): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
+SERVICE_ALERT_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_TOPIC): mqtt.valid_publish_topic,
+        vol.Required(CONF_PAYLOAD): vol.Any(dict, list, cv.string),
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the BZUTech services."""
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Record the integration hot paths for a while and save the result."""
+        if PROFILER.active:
+            raise HomeAssistantError("A Bzu profile is already running")
+        PROFILER.start(call.data[CONF_FORMAT])
+        try:
+            await asyncio.sleep(call.data[CONF_DURATION])
+        finally:
+            PROFILER.stop()
+        extension = "prof" if call.data[CONF_FORMAT] == FORMAT_PSTATS else "txt"
+        path = hass.config.path(
+            f"bzutech_profile.{dt_util.utcnow().strftime('%Y%m%d%H%M%S')}.{extension}"
+        )
+        await hass.async_add_executor_job(PROFILER.write, path)
+
+    async def async_provision(call: ServiceCall) -> None:
+        """Create entries for many gateway ports of an account already set up."""
+        email = call.data[CONF_EMAIL]
+        entry = next(
+            (
+                entry
+                for entry in hass.config_entries.async_entries(DOMAIN)
+                if entry.data.get(CONF_EMAIL) == email
+            ),
+            None,
+        )
+        if entry is None:
+            raise HomeAssistantError(f"No Bzu entry uses the account {email}")
+        password = entry.data[CONF_PASSWORD]
+        api = await async_get_client(hass, email, password)
+        if api is None or not await api.async_discover():
+            raise HomeAssistantError("Invalid Bzu credentials")
+        targets, invalid = resolve_targets(
+            api, parse_targets(call.data[CONF_TARGETS]), configured_ports(hass)
+        )
+        if invalid:
+            raise HomeAssistantError(f"Unknown gateway ports: {', '.join(invalid)}")
+        async_import_ports(
+            hass, [build_port_entry(email, password, *target) for target in targets]
+        )
+
+    async def async_alert(call: ServiceCall) -> None:
+        """Publish an alert ahead of the command replies and bulk uploads."""
+        payload = call.data[CONF_PAYLOAD]
+        if not isinstance(payload, str):
+            payload = json.dumps(payload)
+        async_get_outbound(hass).publish(LANE_ALERT, call.data[CONF_TOPIC], payload)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=SERVICE_PROFILE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROVISION, async_provision, schema=SERVICE_PROVISION_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_ALERT, async_alert, schema=SERVICE_ALERT_SCHEMA
+    )
+    return True
+
+
+def get_platforms(entry: ConfigEntry) -> list[Platform]:
+    """Return the platform of an entry, push entries only have the binary sensor."""
+    if entry.data[CONF_TYPE] == "1":
+        return [Platform.BINARY_SENSOR]
+    return [Platform.SENSOR]
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up BZUTech from a config entry."""
-    bzu_api = BzuTech(entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD])
-    if not await bzu_api.start():
+    with PROFILER.span("api.start"):
+        bzu_api = await async_get_client(
+            hass, entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]
+        )
+    if bzu_api is None:
         return False
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = bzu_api
-    if entry.data[CONF_TYPE] == "1":
-        await hass.config_entries.async_forward_entry_setups(
-            entry, [Platform.BINARY_SENSOR]
-        )
-    else:
-        await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR])
+    await hass.config_entries.async_forward_entry_setups(entry, get_platforms(entry))
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    if unload_ok := await hass.config_entries.async_unload_platforms(entry, ["sensor"]):
+    if unload_ok := await hass.config_entries.async_unload_platforms(
+        entry, get_platforms(entry)
+    ):
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
@@ -0,0 +1,140 @@
+"""BzuTech web API client sharing Home Assistant's HTTP session."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from aiohttp import ClientSession, ClientTimeout
+from bzutech import BzuTech, Device, Sensor
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DATA_CLIENTS
+
+API_URL = "https://back-prd.bzutech.com.br"
+REQUEST_TIMEOUT = ClientTimeout(total=20, connect=10)
+RESTART_COOLDOWN = 60
+
+
+class BzuTechClient(BzuTech):
+    """BzuTech client that sends every request through one pooled session.
+
+    The bzutech library opens a new ``ClientSession`` for each request, which
+    costs a TLS handshake per reading. This client keeps the library models
+    but reuses the session given by Home Assistant, with keep-alive and DNS
+    caching shared by every config entry.
+    """
+
+    def __init__(self, session: ClientSession, email: str, password: str) -> None:
+        """Set up the client."""
+        super().__init__(email, password)
+        self.session = session
+        self.lock = asyncio.Lock()
+        self._restarted_at = -RESTART_COOLDOWN
+
+    async def async_discover(self) -> bool:
+        """Discover the devices of the account again, logging in if needed."""
+        async with self.lock:
+            try:
+                return await self._async_set_dispositivos()
+            except (KeyError, TypeError):
+                # An expired token answers with an error object.
+                return await self.start()
+
+    async def async_restart(self) -> None:
+        """Log in and discover the devices again after the cloud failed.
+
+        Every entry of the account shares the client, so the first caller
+        restarts it and the callers waiting on the lock, or failing within
+        ``RESTART_COOLDOWN`` seconds, reuse that result.
+        """
+        async with self.lock:
+            if time.monotonic() - self._restarted_at < RESTART_COOLDOWN:
+                return
+            try:
+                await self.start()
+            finally:
+                self._restarted_at = time.monotonic()
+
+    async def _async_get(self, path: str) -> Any:
+        async with self.session.get(
+            f"{API_URL}{path}", headers=self.httpheaders, timeout=REQUEST_TIMEOUT
+        ) as resp:
+            return await resp.json()
+
+    async def _async_auth(self) -> bool:
+        async with self.session.post(
+            f"{API_URL}/auth/login/",
+            data={"operador_email": self.email, "password": self.password},
+            timeout=REQUEST_TIMEOUT,
+        ) as resp:
+            resposta = await resp.json()
+        try:
+            self._token = resposta["tokens"]["access"]
+            self._operatorid = resposta["id"]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    async def _async_set_contrato(self) -> bool:
+        resposta = await self._async_get(f"/operador/navbar/{self._operatorid}")
+        self._contratoid = resposta["empresas"][0]["contratos_id"]
+        return True
+
+    async def _async_set_dispositivos(self) -> bool:
+        resposta = await self._async_get(f"/dispositivos/listar/{self._contratoid}")
+        dispositivos = {}
+        for disp in resposta:
+            if disp["status_dispositivo"] == 1:
+                chipid = int(disp["boot_chip_id"])
+                dispname = (
+                    disp["dispnum"] if disp["dispname"] is None else disp["dispname"]
+                )
+                dispositivos[str(chipid)] = Device(chipid, self.httpheaders, dispname)
+        await asyncio.gather(
+            *(self._async_set_sensores(device) for device in dispositivos.values())
+        )
+        self.dispositivos = dispositivos
+        return True
+
+    async def _async_set_sensores(self, device: Device) -> None:
+        resposta = await self._async_get(f"/dispositivos/canais-list/{device.chipid}")
+        device.sensores = {
+            sensor["sensor_nome"].upper(): Sensor(
+                device.chipid,
+                sensor["sensor_nome"].upper(),
+                sensor["apelido_canal"],
+                self.httpheaders,
+            )
+            for sensor in resposta
+            if sensor["ultima_medicao_sensor"] is not None
+        }
+
+    async def get_reading(self, chipid: str, sensorname: str) -> float:
+        """Return the last reading of a channel."""
+        sensor: Sensor = self.dispositivos[chipid].sensores[sensorname.upper()]
+        resposta = await self._async_get(
+            f"/logs/ultima_medicao/{sensor.chipid}/{sensor.sensorref}"
+        )
+        if "medicao" in resposta:
+            sensor.last_reading = int(resposta["medicao"]) / 1000000
+        return sensor.last_reading
+
+
+async def async_get_client(
+    hass: HomeAssistant, email: str, password: str
+) -> BzuTechClient | None:
+    """Return a logged in client shared by every entry of the same account."""
+    clients: dict[str, BzuTechClient] = hass.data.setdefault(DATA_CLIENTS, {})
+    client = clients.get(email)
+    if client is None or client.password != password:
+        client = BzuTechClient(async_get_clientsession(hass), email, password)
+        clients[email] = client
+    async with client.lock:
+        if client.dispositivos is None and not await client.start():
+            clients.pop(email, None)
+            return None
+    return client
@@ -1,6 +1,6 @@
 """Binary sensor for BzuTech Integration."""
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 import json
 import logging
 from typing import Any
@@ -14,17 +14,28 @@ from homeassistant.components.binary_sensor import (
 )
 from homeassistant.components.logbook import log_entry
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import ATTR_ENTITY_ID
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_time_interval
 from homeassistant.util import dt as dt_util
 from homeassistant.util.json import JsonObjectType
 
-from .config_flow import get_all_entities, get_sensortype
-from .const import CONF_CHIPID, CONF_ENTITY, CONF_SENDALL, CONF_SENSORNAME, DOMAIN
-
-SCAN_INTERVAL = timedelta(seconds=30)
+from .channels import ChannelManifest
+from .command import CommandExecutor
+from .config_flow import get_sensortype
+from .const import (
+    CONF_CHIPID,
+    CONF_ENTITY,
+    CONF_SENDALL,
+    CONF_SENSORNAME,
+    CONF_UPLOADINTERVAL,
+    DEFAULT_UPLOADINTERVAL,
+    DOMAIN,
+)
+from .filters import EntityFilter, UploadSet
+from .outbound import LANE_BULK, LANE_COMMAND, LANE_MANIFEST, async_get_outbound
+from .profiler import PROFILER
 
 sensortypes = {
     "temperature": "TMP",
@@ -61,7 +72,7 @@ async def async_setup_entry(
     api: BzuTech = hass.data[DOMAIN][entry.entry_id]
     sensors = []
 
-    sensors.append(BzuBinarySensorEntity(api, entry))
+    sensors.append(BzuBinarySensorEntity(hass, api, entry))
     async_add_entities(sensors, update_before_add=True)
 
 
@@ -100,28 +111,30 @@ def get_actions(event: JsonObjectType):
 class BzuBinarySensorEntity(BinarySensorEntity):
     """Bzutech binary sensor entity."""
 
+    _attr_should_poll = False
     sent_updatechannels = False
-    number_entities = 0
-    entity_id_bzu = {}
+    subscribed = False
+    uploading = False
 
-    def __init__(self, api, entry: ConfigEntry) -> None:
+    def __init__(self, hass: HomeAssistant, api, entry: ConfigEntry) -> None:
         """Set up binary sensor."""
         self.api = api
-        self.sendall = entry.data[CONF_SENDALL]
-        self.entidades = entry.data[CONF_ENTITY]
+        self.entry = entry
+        self.executor = CommandExecutor(hass)
+        self.outbound = async_get_outbound(hass)
+        self.upload_set = UploadSet(hass, EntityFilter(entry.options))
+        self._unsub_upload: CALLBACK_TYPE | None = None
+        self.apply_options(entry)
 
         self.chipid = entry.data[CONF_CHIPID]
+        self.manifest = ChannelManifest(hass, self.chipid)
         self.entityID = "bzu_cloud"
         self.sensor = entry.data[CONF_SENSORNAME]
         self._attr_name = entry.data[CONF_SENSORNAME]
         self._attr_device_class = BinarySensorDeviceClass.RUNNING
         self._attr_unique_id = entry.data[CONF_SENSORNAME]
         self._attr_assumed_state = False
-
-    @property
-    def device_info(self) -> DeviceInfo | None:
-        """Config device info."""
-        return DeviceInfo(
+        self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, self.chipid)},
             suggested_area="Room",
             name=self.chipid,
@@ -135,7 +148,7 @@ class BzuBinarySensorEntity(BinarySensorEntity):
 
     def get_triggers(self, event: JsonObjectType):
         t = "  trigger:\n"
-        event["entity_id"] = self.entity_id_bzu[event["canal_id"]]
+        event["entity_id"] = self.manifest.channels[event["canal_id"]]
         t = (
             t
             + f"  - platform: numeric_state\n    entity_id:\n    - {event["entity_id"]}\n"
@@ -150,45 +163,98 @@ class BzuBinarySensorEntity(BinarySensorEntity):
 
         return t
 
-    async def async_update(
-        self,
+    async def async_added_to_hass(self) -> None:
+        """Schedule the uploads and follow option and registry changes."""
+        self.async_on_remove(self.upload_set.async_setup())
+        self.async_on_remove(self.entry.add_update_listener(self.async_options_updated))
+        self.async_on_remove(self._cancel_upload)
+        self._schedule_upload()
+
+    @callback
+    def apply_options(self, entry: ConfigEntry) -> None:
+        """Apply the entry options without reloading the entry."""
+        self.sendall = entry.options.get(CONF_SENDALL, entry.data[CONF_SENDALL])
+        self.entidades = entry.options.get(CONF_ENTITY, entry.data[CONF_ENTITY])
+        self.upload_interval = timedelta(
+            seconds=entry.options.get(CONF_UPLOADINTERVAL, DEFAULT_UPLOADINTERVAL)
+        )
+        self.upload_set.entity_filter = EntityFilter(entry.options)
+        self.upload_set.invalidate()
+
+    async def async_options_updated(
+        self, hass: HomeAssistant, entry: ConfigEntry
     ) -> None:
-        """Upload Readings to cloud."""
+        """Reconfigure the running entity when the options change."""
+        self.apply_options(entry)
+        self._schedule_upload()
+
+    @callback
+    def _schedule_upload(self) -> None:
+        self._cancel_upload()
+        self._unsub_upload = async_track_time_interval(
+            self.hass, self._async_upload, self.upload_interval
+        )
 
-        date = str(dt_util.as_local(dt_util.now()))[:19]
-        if self.sendall == 1:
-            self.entidades = get_all_entities(self.hass)
+    @callback
+    def _cancel_upload(self) -> None:
+        if self._unsub_upload is not None:
+            self._unsub_upload()
+            self._unsub_upload = None
+
+    async def _async_upload(self, now: datetime) -> None:
+        if self.uploading:
+            logging.debug("Previous Bzu Cloud upload still running, skipping")
+            return
+        self.uploading = True
+        try:
+            await self.async_update_ha_state(force_refresh=True)
+        finally:
+            self.uploading = False
+
+    async def async_subscribe_cloud(self) -> None:
+        """Subscribe once to the command topics of Bzu Cloud."""
+        self.subscribed = True
+        self.async_on_remove(
+            await mqtt.async_subscribe(
+                self.hass,
+                f"hacall/{self.chipid.split("-")[1]}",
+                self.async_call_service_mqtt,
+            )
+        )
+        self.async_on_remove(
+            await mqtt.async_subscribe(
+                self.hass,
+                f"alerta_ha/{self.chipid.split("-")[1]}",
+                self.async_create_automation,
+                2,
+            )
+        )
+        self.async_on_remove(
+            await mqtt.async_subscribe(
+                self.hass,
+                f"hasync/{self.chipid.split("-")[1]}",
+                self.async_resync_channels,
+            )
+        )
 
-        readings: dict[str, Any] = {}
-        readings["Records"] = []
-        readings["Records"].append({})
-        readings["Records"][0]["bci"] = self.chipid
-        readings["Records"][0]["date"] = date
-        data = []
-        channels: dict[str, Any] = {}
-        channels["Records"] = []
-        channels["Records"].append({})
-        channels["Records"][0]["bci"] = self.chipid
-        chs = []
-
-        @callback
-        async def async_call_service_mqtt(msg: mqtt.ReceiveMessage) -> None:
-            call = json.loads(msg.payload)
-
-            entity = call["entity"]
-            funcao = call["method"]
-            entitytype = entity.split(".")[0]
-            retorno = {}
-            retorno["info"] = "funcao invalida"
-            if funcao in self.hass.services.async_services_for_domain(entitytype):
-                await self.hass.services.async_call(
-                    entitytype, funcao, {ATTR_ENTITY_ID: [entity]}, True
-                )
-                retorno["info"] = "sucesso"
-            mqtt.publish(self.hass, "hacallreturn", str(retorno))
+    async def async_resync_channels(self, msg: mqtt.ReceiveMessage) -> None:
+        """Publish every channel when the cloud asks for a full resync."""
+        with PROFILER.span("mqtt.hasync"):
+            if not self.manifest.loaded:
+                await self.manifest.async_load()
+            self.outbound.publish(
+                LANE_MANIFEST, "UpdateChannels", str(self.manifest.full())
+            )
 
-        @callback
-        async def async_create_automation(msg: mqtt.ReceiveMessage) -> None:
+    async def async_call_service_mqtt(self, msg: mqtt.ReceiveMessage) -> None:
+        """Run the commands sent by the cloud and publish the reply."""
+        with PROFILER.span("mqtt.hacall"):
+            retorno = await self.executor.async_handle(msg.payload)
+            self.outbound.publish(LANE_COMMAND, "hacallreturn", retorno)
+
+    async def async_create_automation(self, msg: mqtt.ReceiveMessage) -> None:
+        """Create an automation for an alert configured in the cloud."""
+        with PROFILER.span("mqtt.alerta_ha"):
             automation = "\n"
             event = json.loads(msg.payload)
 
@@ -210,10 +276,9 @@ class BzuBinarySensorEntity(BinarySensorEntity):
                 automation = automation + self.get_triggers(event)
                 # automation = automation + get_conditions(event)
                 automation = automation + "  action:\n"
-                automation = automation + "  - action: mqtt.publish\n"
+                automation = automation + f"  - action: {DOMAIN}.alert\n"
                 automation = automation + "    metadata: {}\n"
                 automation = automation + "    data:\n"
-                automation = automation + "      qos: 1\n"
                 automation = (
                     automation
                     + f"      topic: ha_alert_action/{self.chipid.split("-")[1]}\n"
@@ -223,7 +288,7 @@ class BzuBinarySensorEntity(BinarySensorEntity):
                     '\'{"Records": [{"alerta_id":'
                     + str(event["alerta_id"])
                     + ', "value": {{states("'
-                    + self.entity_id_bzu[event["canal_id"]]
+                    + self.manifest.channels[event["canal_id"]]
                     + "\")}} }]}'"
                 )
                 automation = automation + f"      payload: {payload}"
@@ -239,43 +304,66 @@ class BzuBinarySensorEntity(BinarySensorEntity):
                     f.close()
                 await self.hass.services.async_call("automation", "reload")
 
+    async def async_update(
+        self,
+    ) -> None:
+        """Upload Readings to cloud."""
+        with PROFILER.span("push.cycle"):
+            await self.async_push()
+
+    async def async_push(self) -> None:
+        """Read the uploaded entities and publish them."""
+        date = str(dt_util.as_local(dt_util.now()))[:19]
+        entidades = self.entidades
+        with PROFILER.span("push.scan"):
+            if self.sendall:
+                entidades = self.upload_set.entities
+
+        readings: dict[str, Any] = {}
+        readings["Records"] = []
+        readings["Records"].append({})
+        readings["Records"][0]["bci"] = self.chipid
+        readings["Records"][0]["date"] = date
+        data = []
+        chs: dict[str, str] = {}
+
         if await mqtt.async_wait_for_mqtt_client(self.hass):
-            await mqtt.async_subscribe(
-                self.hass,
-                f"hacall/{self.chipid.split("-")[1]}",
-                async_call_service_mqtt,
-            )
-            await mqtt.async_subscribe(
-                self.hass,
-                f"alerta_ha/{self.chipid.split("-")[1]}",
-                async_create_automation,
-                2,
-            )
-            for entity in self.entidades:
-                try:
-                    stt = self.hass.states.get(entity)
-                    if stt is not None:
-                        reading = stt.as_dict()["state"]
-                except (AttributeError, ValueError):
-                    logging.error("Sensor name error")
-                    return
-                sensor = f"HA-{get_sensortype(self.hass, entity)}-{stringtoint(entity)}"
-                self.entity_id_bzu[sensor] = entity
-                chs.append(sensor)
-                data.append({"ref": sensor, "med": reading})
-            channels["Records"][0]["channels"] = str(chs).replace("'", r'*"')
-            readings["Records"][0]["data"] = str(data).replace("'", r'*"')
-            if len(self.entidades) != self.number_entities:
-                self.number_entities = len(self.entidades)
-                for key in self.entity_id_bzu:  # pylint: disable=consider-using-dict-items
-                    log_entry(
-                        self.hass,
-                        "Sensor Name Bzu Cloud",
-                        f"{self.entity_id_bzu[key]} -> {key}",
-                        DOMAIN,
-                        "binary_sensor.bzu_cloud",
+            if not self.subscribed:
+                await self.async_subscribe_cloud()
+            with PROFILER.span("push.scan"):
+                for entity in entidades:
+                    try:
+                        stt = self.hass.states.get(entity)
+                        if stt is not None:
+                            reading = stt.as_dict()["state"]
+                    except (AttributeError, ValueError):
+                        logging.error("Sensor name error")
+                        return
+                    sensor = (
+                        f"HA-{get_sensortype(self.hass, entity)}-{stringtoint(entity)}"
+                    )
+                    chs[sensor] = entity
+                    data.append({"ref": sensor, "med": reading})
+            with PROFILER.span("push.serialize"):
+                readings["Records"][0]["data"] = str(data).replace("'", r'*"')
+                payload = str(readings)
+            if not self.manifest.loaded:
+                await self.manifest.async_load()
+            added, removed = self.manifest.update(chs)
+            with PROFILER.span("push.publish"):
+                if added or removed:
+                    for key in added:
+                        log_entry(
+                            self.hass,
+                            "Sensor Name Bzu Cloud",
+                            f"{chs[key]} -> {key}",
+                            DOMAIN,
+                            "binary_sensor.bzu_cloud",
+                        )
+                    self.outbound.publish(
+                        LANE_MANIFEST,
+                        "UpdateChannels",
+                        str(self.manifest.delta(added, removed)),
                     )
-                mqtt.publish(self.hass, "UpdateChannels", str(channels))
-            logging.warning(self.entity_id_bzu)
-            mqtt.publish(self.hass, "data_send", str(readings))
+                self.outbound.publish(LANE_BULK, "data_send", payload)
         self._attr_is_on = True
@@ -0,0 +1,88 @@
+"""Versioned manifest of the channels announced to Bzu Cloud."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 10
+
+
+def encode_channels(channels: list[str]) -> str:
+    """Encode a channel list the way the cloud parses it."""
+    return str(channels).replace("'", r'*"')
+
+
+class ChannelManifest:
+    """Track the channels known by the cloud and publish only the changes.
+
+    Every change bumps ``version``. The version and the channel map are
+    persisted, so a restart does not announce unchanged channels again and
+    the cloud can ask for a full resync when its version drifts.
+    """
+
+    def __init__(self, hass: HomeAssistant, chipid: str) -> None:
+        """Set up the manifest for a push gateway."""
+        self.chipid = chipid
+        self.version = 0
+        self.channels: dict[str, str] = {}
+        self.loaded = False
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{chipid}.channels"
+        )
+
+    async def async_load(self) -> None:
+        """Load the last announced manifest."""
+        if (stored := await self._store.async_load()) is not None:
+            self.version = stored["version"]
+            self.channels = stored["channels"]
+        self.loaded = True
+
+    def update(self, channels: dict[str, str]) -> tuple[list[str], list[str]]:
+        """Replace the channel map, returning the added and removed channels.
+
+        A channel now pointing to another entity is announced again as added,
+        entity ids with the same characters share a channel ref.
+        """
+        added = [
+            ref for ref, entity in channels.items() if self.channels.get(ref) != entity
+        ]
+        removed = [ref for ref in self.channels if ref not in channels]
+        self.channels = channels
+        if added or removed:
+            self.version += 1
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+        return added, removed
+
+    def delta(self, added: list[str], removed: list[str]) -> dict[str, Any]:
+        """Build the UpdateChannels payload for a change."""
+        return {
+            "Records": [
+                {
+                    "bci": self.chipid,
+                    "version": self.version,
+                    "added": encode_channels(added),
+                    "removed": encode_channels(removed),
+                }
+            ]
+        }
+
+    def full(self) -> dict[str, Any]:
+        """Build the UpdateChannels payload with every channel."""
+        return {
+            "Records": [
+                {
+                    "bci": self.chipid,
+                    "version": self.version,
+                    "channels": encode_channels(list(self.channels)),
+                }
+            ]
+        }
+
+    def _data_to_save(self) -> dict[str, Any]:
+        return {"version": self.version, "channels": self.channels}
@@ -0,0 +1,210 @@
+"""Command executor for service calls requested by Bzu Cloud."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+import json
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_WORKERS = 8
+COMMAND_TIMEOUT = 10.0
+
+RESULT_SUCCESS = "sucesso"
+RESULT_INVALID_METHOD = "funcao invalida"
+RESULT_INVALID_ENTITY = "entidade invalida"
+RESULT_TIMEOUT = "tempo esgotado"
+RESULT_ERROR = "erro"
+RESULT_INVALID_PAYLOAD = "payload invalido"
+RESULT_DUPLICATE_ID = "id duplicado"
+
+
+@dataclass
+class Command:
+    """Single service call requested by the cloud."""
+
+    command_id: str
+    domain: str
+    method: str
+    entities: list[str]
+    data: dict[str, Any]
+    timeout: float
+
+
+@dataclass
+class CommandGroup:
+    """Commands that can be sent as one multi-entity service call."""
+
+    domain: str
+    method: str
+    data: dict[str, Any]
+    commands: list[Command] = field(default_factory=list)
+
+    @property
+    def entities(self) -> list[str]:
+        """Return every entity targeted by the group, without duplicates."""
+        return list(dict.fromkeys(e for c in self.commands for e in c.entities))
+
+    @property
+    def timeout(self) -> float:
+        """Return the longest timeout requested inside the group."""
+        return max(c.timeout for c in self.commands)
+
+
+class CommandExecutor:
+    """Run batches of cloud commands through a bounded worker pool.
+
+    Accepted payloads are the legacy ``{"entity": ..., "method": ...}`` object,
+    a list of commands, or ``{"request_id": ..., "commands": [...]}``. Each
+    command may carry an ``id``, ``data`` and ``timeout``. Commands with the
+    same domain, method and data are merged into one service call.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_workers: int = MAX_WORKERS) -> None:
+        """Set up the executor."""
+        self.hass = hass
+        self._workers = asyncio.Semaphore(max_workers)
+
+    async def async_handle(self, payload: str | bytes) -> str:
+        """Execute a payload received on hacall and return the reply."""
+        try:
+            call = json.loads(payload)
+        except ValueError:
+            _LOGGER.error("Invalid command payload: %s", payload)
+            return json.dumps({"info": RESULT_INVALID_PAYLOAD})
+
+        if isinstance(call, dict) and "commands" not in call:
+            # Legacy single command, keep the reply the cloud already expects.
+            results = await self.async_execute([call])
+            return str({"info": next(iter(results.values()))})
+
+        request_id = None
+        if isinstance(call, dict):
+            request_id = call.get("request_id")
+            call = call["commands"]
+        if not isinstance(call, list):
+            return json.dumps(
+                {"request_id": request_id, "info": RESULT_INVALID_PAYLOAD}
+            )
+        results = await self.async_execute(call)
+        return json.dumps({"request_id": request_id, "results": results})
+
+    async def async_execute(self, calls: Iterable[Any]) -> dict[str, str]:
+        """Execute commands and return the result of each one by its id.
+
+        Commands sharing an id are not run, since their results could not be
+        told apart.
+        """
+        results: dict[str, str] = {}
+        groups: dict[tuple[str, str, str], CommandGroup] = {}
+
+        calls = list(calls)
+        command_ids = [
+            str(call.get("id", index)) if isinstance(call, dict) else str(index)
+            for index, call in enumerate(calls)
+        ]
+        counts = Counter(command_ids)
+        for command_id, call in zip(command_ids, calls, strict=True):
+            if counts[command_id] > 1:
+                results[command_id] = RESULT_DUPLICATE_ID
+                continue
+            command = self._parse(command_id, call)
+            if isinstance(command, str):
+                results[command_id] = command
+                continue
+            key = (
+                command.domain,
+                command.method,
+                json.dumps(command.data, sort_keys=True, default=str),
+            )
+            if key not in groups:
+                groups[key] = CommandGroup(command.domain, command.method, command.data)
+            groups[key].commands.append(command)
+
+        outcomes = await asyncio.gather(
+            *(self._async_run_group(group) for group in groups.values())
+        )
+        for group, outcome in zip(groups.values(), outcomes, strict=True):
+            for command in group.commands:
+                results[command.command_id] = outcome
+        return results
+
+    def _parse(self, command_id: str, call: Any) -> Command | str:
+        """Validate a command, returning the error result when it is invalid."""
+        if not isinstance(call, dict) or "entity" not in call or "method" not in call:
+            return RESULT_INVALID_ENTITY
+        entities = call["entity"]
+        if isinstance(entities, str):
+            entities = [entities]
+        if not isinstance(entities, list) or not entities:
+            return RESULT_INVALID_ENTITY
+        domains = {str(entity).split(".")[0] for entity in entities}
+        if len(domains) != 1 or not all("." in str(e) for e in entities):
+            return RESULT_INVALID_ENTITY
+
+        domain = domains.pop()
+        method = call["method"]
+        services = self.hass.services.async_services_for_domain(domain)
+        if not isinstance(method, str) or method not in services:
+            return RESULT_INVALID_METHOD
+
+        data = call.get("data") or {}
+        if not isinstance(data, dict):
+            return RESULT_INVALID_PAYLOAD
+        try:
+            timeout = float(call.get("timeout", COMMAND_TIMEOUT))
+        except (TypeError, ValueError):
+            return RESULT_INVALID_PAYLOAD
+        if not timeout > 0:
+            return RESULT_INVALID_PAYLOAD
+        data = {k: v for k, v in data.items() if k != ATTR_ENTITY_ID}
+        return Command(
+            command_id,
+            domain,
+            method,
+            [str(entity) for entity in entities],
+            data,
+            timeout,
+        )
+
+    async def _async_run_group(self, group: CommandGroup) -> str:
+        """Send one service call for a group of commands."""
+        async with self._workers:
+            try:
+                async with asyncio.timeout(group.timeout):
+                    await self.hass.services.async_call(
+                        group.domain,
+                        group.method,
+                        {**group.data, ATTR_ENTITY_ID: group.entities},
+                        blocking=True,
+                    )
+            except TimeoutError:
+                _LOGGER.warning(
+                    "Timeout calling %s.%s for %s",
+                    group.domain,
+                    group.method,
+                    group.entities,
+                )
+                return RESULT_TIMEOUT
+            except (HomeAssistantError, vol.Invalid, ValueError) as error:
+                _LOGGER.error(
+                    "Error calling %s.%s: %s", group.domain, group.method, error
+                )
+                return RESULT_ERROR
+            except Exception:
+                _LOGGER.exception(
+                    "Unexpected error calling %s.%s", group.domain, group.method
+                )
+                return RESULT_ERROR
+        return RESULT_SUCCESS
@@ -12,9 +12,10 @@ import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.components import mqtt
 from homeassistant.config_entries import ConfigFlowResult
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_EMAIL, CONF_HOST, CONF_PASSWORD
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.selector import (
     EntitySelector,
     EntitySelectorConfig,
@@ -22,18 +23,33 @@ from homeassistant.helpers.selector import (
     SelectSelector,
     SelectSelectorConfig,
     SelectSelectorMode,
+    TextSelector,
+    TextSelectorConfig,
 )
 
+from .api import BzuTechClient
 from .const import (
     CONF_CHIPID,
+    CONF_DERIVEDPOWER,
     CONF_ENDPOINT,
     CONF_ENTITY,
+    CONF_EXCLUDE,
+    CONF_HOURLY,
+    CONF_INCLUDE,
+    CONF_POLLINTERVAL,
+    CONF_POWERFACTOR,
     CONF_SENDALL,
     CONF_SENSORNAME,
     CONF_SENSORPORT,
+    CONF_TARGETS,
     CONF_TYPE,
+    CONF_UPLOADINTERVAL,
+    DEFAULT_POLLINTERVAL,
+    DEFAULT_UPLOADINTERVAL,
     DOMAIN,
+    FILTER_FIELDS,
 )
+from .sensor import get_sensors
 
 sensortypes = {
     "temperature": "TMP",
@@ -68,7 +84,9 @@ STEP_USER_LOGIN_SCHEMA = vol.Schema(
 
 async def get_api(hass: HomeAssistant, data: dict[str, Any]) -> BzuTech:
     """Validate the user input allows us to connect."""
-    return BzuTech(data[CONF_EMAIL], data[CONF_PASSWORD])
+    return BzuTechClient(
+        async_get_clientsession(hass), data[CONF_EMAIL], data[CONF_PASSWORD]
+    )
 
 
 def get_ports(api: BzuTech, chipid: str) -> list[str]:
@@ -76,6 +94,88 @@ def get_ports(api: BzuTech, chipid: str) -> list[str]:
     return [f"Port {i} {api.get_endpoint_on(chipid, i)}" for i in range(1, 5)]
 
 
+def get_endpoint(api: BzuTech, chipid: str, port: str) -> str | None:
+    """Get the endpoint on a port, ports with only SHT20 and BH1750 are EP101."""
+    endpoint = api.get_endpoint_on(chipid, int(port))
+    if endpoint is None and api.get_sensors_on(chipid, port):
+        return "EP101"
+    return endpoint
+
+
+def parse_targets(targets: str | list[str]) -> list[str]:
+    """Split a bulk import into chipid:port items."""
+    if isinstance(targets, str):
+        targets = [targets]
+    return [item for text in targets for item in re.split(r"[\s,;]+", text) if item]
+
+
+def resolve_targets(
+    api: BzuTech, targets: list[str], configured: set[tuple[str, str]]
+) -> tuple[list[tuple[str, str, str]], list[str]]:
+    """Match chipid:port or chipid:all items with the discovered gateways.
+
+    Returns the (chipid, port, endpoint) to create, skipping ports that are
+    already configured, and the items that do not match a gateway port.
+    """
+    devices = set(api.get_device_names())
+    found: list[tuple[str, str, str]] = []
+    invalid: list[str] = []
+    for target in targets:
+        chipid, _, port = target.partition(":")
+        every_port = port in ("", "all")
+        ports = ["1", "2", "3", "4"] if every_port else [port]
+        if chipid not in devices or not all(p in ("1", "2", "3", "4") for p in ports):
+            invalid.append(target)
+            continue
+        endpoints = [(p, get_endpoint(api, chipid, p)) for p in ports]
+        if not every_port and endpoints[0][1] is None:
+            invalid.append(target)
+            continue
+        found.extend(
+            (chipid, p, endpoint)
+            for p, endpoint in endpoints
+            if endpoint is not None
+            and (chipid, p) not in configured
+            and (chipid, p, endpoint) not in found
+        )
+    return found, invalid
+
+
+def configured_ports(hass: HomeAssistant) -> set[tuple[str, str]]:
+    """Get the gateway ports that already have an entry."""
+    return {
+        (str(entry.data.get(CONF_CHIPID)), entry.data.get(CONF_SENSORPORT))
+        for entry in hass.config_entries.async_entries(DOMAIN)
+    }
+
+
+def build_port_entry(
+    email: str, password: str, chipid: str, port: str, endpoint: str
+) -> dict[str, Any]:
+    """Build the entry data of a gateway port."""
+    return {
+        CONF_ENDPOINT: endpoint,
+        CONF_SENSORPORT: port,
+        CONF_PASSWORD: password,
+        CONF_TYPE: "0",
+        CONF_EMAIL: email,
+        CONF_CHIPID: chipid,
+        CONF_DERIVEDPOWER: False,
+        CONF_POWERFACTOR: 1.0,
+    }
+
+
+@callback
+def async_import_ports(hass: HomeAssistant, entries: list[dict[str, Any]]) -> None:
+    """Start one import flow per gateway port."""
+    for data in entries:
+        hass.async_create_task(
+            hass.config_entries.flow.async_init(
+                DOMAIN, context={"source": config_entries.SOURCE_IMPORT}, data=data
+            )
+        )
+
+
 def get_all_entities(hass: HomeAssistant) -> dict[str, str]:
     entitylist = get_entities(hass)[1:]
     for x in hass.states.async_entity_ids(["switch", "light", "remote"]):
@@ -129,6 +229,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     selectedentity = ""
     selectedport = 0
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> BzuOptionsFlow:
+        """Get the options flow for this handler."""
+        return BzuOptionsFlow()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -146,9 +254,7 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
             self.email = user_input[CONF_EMAIL]
             self.password = user_input[CONF_PASSWORD]
-            if not self.hass.states.get("binary_sensor.bzu_cloud"):
-                return await self.async_step_typeselect(user_input=user_input)
-            return await self.async_step_deviceselect(user_input)
+            return await self.async_step_typeselect(user_input=user_input)
         return self.async_show_form(
             step_id="user",
             data_schema=STEP_USER_LOGIN_SCHEMA,
@@ -202,6 +308,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             self.selectedtype = user_input[CONF_TYPE]
             if self.selectedtype == "0":
                 return await self.async_step_deviceselect(user_input=user_input)
+            if self.selectedtype == "2":
+                return await self.async_step_bulkimport(user_input=user_input)
             if await mqtt.async_wait_for_mqtt_client(self.hass):
                 return await self.async_step_addentities(user_input=user_input)
 
@@ -211,19 +319,19 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 to connect to Bzu broker."""
             )
 
+        options = [
+            SelectOptionDict(value="0", label="Receive data from Bzu"),
+            SelectOptionDict(value="2", label="Import many gateways from Bzu"),
+        ]
+        if not self.hass.states.get("binary_sensor.bzu_cloud"):
+            options.insert(0, SelectOptionDict(value="1", label="Send data to Bzu"))
         return self.async_show_form(
             step_id="typeselect",
             data_schema=vol.Schema(
                 {
                     vol.Required(CONF_TYPE): SelectSelector(
                         SelectSelectorConfig(
-                            options=[
-                                SelectOptionDict(value="1", label="Send data to Bzu"),
-                                SelectOptionDict(
-                                    value="0",
-                                    label="Receive data from Bzu",
-                                ),
-                            ],
+                            options=options,
                             mode=SelectSelectorMode.LIST,
                         )
                     ),
@@ -231,6 +339,57 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             ),
         )
 
+    async def async_step_bulkimport(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Create entries for many gateway ports at once."""
+        errors: dict[str, str] = {}
+        placeholders = {"invalid": ""}
+        if user_input is not None and CONF_TARGETS in user_input:
+            targets, invalid = resolve_targets(
+                self.api,
+                parse_targets(user_input[CONF_TARGETS]),
+                configured_ports(self.hass),
+            )
+            if invalid:
+                errors[CONF_TARGETS] = "invalid_targets"
+                placeholders["invalid"] = ", ".join(invalid)
+            elif not targets:
+                return self.async_abort(reason="already_configured")
+            else:
+                async_import_ports(
+                    self.hass,
+                    [
+                        build_port_entry(self.email, self.password, *target)
+                        for target in targets
+                    ],
+                )
+                return self.async_abort(
+                    reason="bulk_imported",
+                    description_placeholders={"count": str(len(targets))},
+                )
+
+        return self.async_show_form(
+            step_id="bulkimport",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_TARGETS): TextSelector(
+                        TextSelectorConfig(multiline=True)
+                    ),
+                }
+            ),
+            errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> ConfigFlowResult:
+        """Create a gateway port entry started by a bulk import."""
+        chipid = import_data[CONF_CHIPID]
+        port = import_data[CONF_SENSORPORT]
+        await self.async_set_unique_id(f"{chipid}-{port}")
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=f"BZUGW-{chipid}-{port}", data=import_data)
+
     async def async_step_deviceselect(
         self, user_input: dict[str, Any] | None = None
     ) -> ConfigFlowResult:
@@ -266,6 +425,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 CONF_TYPE: self.selectedtype,
                 CONF_EMAIL: self.email,
                 CONF_CHIPID: self.selecteddevice,
+                CONF_DERIVEDPOWER: user_input.get(CONF_DERIVEDPOWER, False),
+                CONF_POWERFACTOR: user_input.get(CONF_POWERFACTOR, 1.0),
             }
             return self.async_create_entry(
                 title=f"BZUGW-{self.selecteddevice}-{user_input[CONF_SENSORPORT]}",
@@ -286,11 +447,106 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                             mode=SelectSelectorMode.LIST,
                         )
                     ),
+                    vol.Optional(CONF_DERIVEDPOWER, default=False): bool,
+                    vol.Optional(CONF_POWERFACTOR, default=1.0): vol.All(
+                        vol.Coerce(float), vol.Range(min=0, max=1)
+                    ),
                 }
             ),
         )
 
 
+class BzuOptionsFlow(config_entries.OptionsFlow):
+    """Handle the options of a BZUTech entry.
+
+    The running entities and coordinators listen to the entry updates and
+    apply the new options in place, so saving does not reload the entry.
+    """
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Show the options of the entry type."""
+        if self.config_entry.data[CONF_TYPE] == "1":
+            return await self.async_step_upload(user_input)
+        return await self.async_step_poll(user_input)
+
+    async def async_step_upload(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Set up the upload interval and the entities sent to the cloud."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        data = self.config_entry.data
+        options = self.config_entry.options
+        schema: dict[Any, Any] = {
+            vol.Required(
+                CONF_UPLOADINTERVAL,
+                default=options.get(CONF_UPLOADINTERVAL, DEFAULT_UPLOADINTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=5)),
+            vol.Optional(
+                CONF_SENDALL, default=options.get(CONF_SENDALL, data[CONF_SENDALL])
+            ): bool,
+            vol.Optional(
+                CONF_ENTITY, default=options.get(CONF_ENTITY, data[CONF_ENTITY])
+            ): EntitySelector(
+                EntitySelectorConfig(
+                    domain=["sensor", "light", "switch"],
+                    multiple=True,
+                )
+            ),
+        }
+        for kind in (CONF_INCLUDE, CONF_EXCLUDE):
+            for field in FILTER_FIELDS:
+                schema[
+                    vol.Optional(
+                        f"{kind}_{field}", default=options.get(f"{kind}_{field}", [])
+                    )
+                ] = TextSelector(TextSelectorConfig(multiple=True))
+        return self.async_show_form(step_id="upload", data_schema=vol.Schema(schema))
+
+    async def async_step_poll(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Set up the polling and recording of a gateway port."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        data = self.config_entry.data
+        options = self.config_entry.options
+        api = self.hass.data.get(DOMAIN, {}).get(self.config_entry.entry_id)
+        schema: dict[Any, Any] = {
+            vol.Required(
+                CONF_POLLINTERVAL,
+                default=options.get(CONF_POLLINTERVAL, DEFAULT_POLLINTERVAL),
+            ): vol.All(vol.Coerce(int), vol.Range(min=10)),
+            vol.Optional(CONF_HOST, default=options.get(CONF_HOST, "")): str,
+            vol.Optional(
+                CONF_HOURLY, default=options.get(CONF_HOURLY, [])
+            ): SelectSelector(
+                SelectSelectorConfig(
+                    options=[
+                        SelectOptionDict(value=sensorname, label=sensorname)
+                        for sensorname, _ in get_sensors(self.config_entry, api)
+                    ],
+                    multiple=True,
+                    mode=SelectSelectorMode.DROPDOWN,
+                )
+            ),
+        }
+        if data[CONF_ENDPOINT] == "EP400" and data.get(CONF_DERIVEDPOWER):
+            schema[
+                vol.Required(
+                    CONF_POWERFACTOR,
+                    default=options.get(
+                        CONF_POWERFACTOR, data.get(CONF_POWERFACTOR, 1.0)
+                    ),
+                )
+            ] = vol.All(vol.Coerce(float), vol.Range(min=0, max=1))
+        return self.async_show_form(step_id="poll", data_schema=vol.Schema(schema))
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
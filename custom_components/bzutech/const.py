@@ -8,3 +8,16 @@ CONF_ENDPOINT = "endpoint"
 CONF_TYPE = "entitytype"
 CONF_ENTITY = "ENTITYID"
 CONF_SENDALL = "todos"
+CONF_DERIVEDPOWER = "derivedpower"
+CONF_POWERFACTOR = "powerfactor"
+CONF_INCLUDE = "include"
+CONF_EXCLUDE = "exclude"
+FILTER_FIELDS = ("entity_id", "domain", "device_class", "area", "integration")
+CONF_UPLOADINTERVAL = "uploadinterval"
+CONF_POLLINTERVAL = "pollinterval"
+DEFAULT_UPLOADINTERVAL = 30
+DEFAULT_POLLINTERVAL = 300
+CONF_HOURLY = "hourly"
+DATA_CLIENTS = f"{DOMAIN}_clients"
+DATA_OUTBOUND = f"{DOMAIN}_outbound"
+CONF_TARGETS = "targets"
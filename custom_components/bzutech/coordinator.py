@@ -0,0 +1,192 @@
+"""Coordinators for the BZUTech integration."""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import logging
+import time
+
+from aiohttp import ClientError
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import BzuTechClient
+from .const import (
+    CONF_CHIPID,
+    CONF_HOURLY,
+    CONF_POLLINTERVAL,
+    CONF_POWERFACTOR,
+    CONF_SENSORPORT,
+    DEFAULT_POLLINTERVAL,
+    DOMAIN,
+)
+from .local import BzuLocal
+from .power import (
+    CURRENT_CHANNELS,
+    PHASES,
+    RAW_CHANNELS,
+    VOLTAGE_CHANNELS,
+    PowerEngine,
+)
+from .profiler import PROFILER
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BzuCoordinator(DataUpdateCoordinator[dict[str, float | None]]):
+    """Poll every channel of a gateway port in one refresh.
+
+    The web API has no endpoint returning every reading of a port, so the
+    channels are still requested one by one, but concurrently and on a
+    single schedule that the options flow can change in place. When a LAN
+    host is set, the port is read from the gateway and only the channels it
+    does not return are requested from the cloud.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: BzuTechClient,
+        entry: ConfigEntry,
+        channels: list[str],
+    ) -> None:
+        """Set up the coordinator for one port."""
+        self.api = api
+        self.chipid = str(entry.data[CONF_CHIPID])
+        self.port = entry.data[CONF_SENSORPORT]
+        self.channels = channels
+        self.local = get_local(hass, entry)
+        self.hourly = get_hourly(entry)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}-{self.chipid}-{self.port}",
+            update_interval=get_poll_interval(entry),
+        )
+
+    async def async_options_updated(
+        self, hass: HomeAssistant, entry: ConfigEntry
+    ) -> None:
+        """Apply the new poll interval and LAN host, refreshing right away.
+
+        The refresh also schedules the next one with the new interval instead
+        of waiting out the one set with the old interval.
+        """
+        self.update_interval = get_poll_interval(entry)
+        self.local = get_local(hass, entry)
+        self.hourly = get_hourly(entry)
+        await self.async_request_refresh()
+
+    async def _async_update_data(self) -> dict[str, float | None]:
+        """Fetch every channel of the port."""
+        with PROFILER.span("sensor.refresh"):
+            return await self._async_fetch(self.channels)
+
+    async def _async_fetch(self, channels: list[str]) -> dict[str, float | None]:
+        """Fetch channels, a channel without reading is set to None."""
+        values: dict[str, float | None] = dict.fromkeys(channels)
+        remote = channels
+        if self.local is not None and self.local.available:
+            with PROFILER.span("local.get_readings"):
+                local = await self.local.async_get_readings(self.port)
+            if local is not None:
+                values.update((name, local[name]) for name in channels if name in local)
+                remote = [name for name in channels if name not in local]
+
+        with PROFILER.span("api.get_reading"):
+            readings = await asyncio.gather(
+                *(self.api.get_reading(self.chipid, name) for name in remote),
+                return_exceptions=True,
+            )
+
+        for name, reading in zip(remote, readings, strict=True):
+            if isinstance(reading, (KeyError, TypeError, ClientError, TimeoutError)):
+                _LOGGER.debug("No reading for %s on %s: %s", name, self.chipid, reading)
+                values[name] = None
+            elif isinstance(reading, BaseException):
+                raise reading
+            else:
+                values[name] = reading
+
+        if channels and all(value is None for value in values.values()):
+            await self.api.async_restart()
+            raise UpdateFailed(f"No readings from {self.chipid} port {self.port}")
+        return values
+
+
+class Ep400Coordinator(BzuCoordinator):
+    """Poll the raw EP400 channels once and derive the power values locally."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: BzuTechClient,
+        entry: ConfigEntry,
+        channels: list[str],
+    ) -> None:
+        """Set up the coordinator for one EP400 port."""
+        super().__init__(hass, api, entry, channels)
+        self.engine = PowerEngine(get_power_factor(entry))
+
+    async def async_options_updated(
+        self, hass: HomeAssistant, entry: ConfigEntry
+    ) -> None:
+        """Apply the new poll interval and power factor."""
+        self.engine.power_factor = get_power_factor(entry)
+        await super().async_options_updated(hass, entry)
+
+    @callback
+    def async_restore_energy(self, key: str, value: float) -> None:
+        """Continue an energy total from its value before a restart."""
+        if key[-1] in PHASES:
+            self.engine.energy[PHASES.index(key[-1])] = value
+        if self.data is not None:
+            self.data[f"ADS7878-{key}-{self.port}"] = value
+
+    async def _async_update_data(self) -> dict[str, float | None]:
+        """Fetch voltage and current for every phase."""
+        with PROFILER.span("ep400.refresh"):
+            values = await self._async_fetch(self.channels)
+
+        raw = {key: values.get(f"ADS7878-{key}-{self.port}") for key in RAW_CHANNELS}
+        if any(value is None for value in raw.values()):
+            return values
+        with PROFILER.span("ep400.compute"):
+            derived = self.engine.compute(
+                [raw[key] for key in VOLTAGE_CHANNELS],
+                [raw[key] for key in CURRENT_CHANNELS],
+                time.monotonic(),
+            )
+        values.update(
+            {f"ADS7878-{key}-{self.port}": value for key, value in derived.items()}
+        )
+        return values
+
+
+def get_poll_interval(entry: ConfigEntry) -> timedelta:
+    """Return the poll interval set in the entry options."""
+    return timedelta(
+        seconds=entry.options.get(CONF_POLLINTERVAL, DEFAULT_POLLINTERVAL)
+    )
+
+
+def get_hourly(entry: ConfigEntry) -> set[str]:
+    """Return the channel names whose state is only written once an hour."""
+    return set(entry.options.get(CONF_HOURLY, []))
+
+
+def get_local(hass: HomeAssistant, entry: ConfigEntry) -> BzuLocal | None:
+    """Return the LAN transport when a gateway host is set in the options."""
+    if not (host := entry.options.get(CONF_HOST)):
+        return None
+    return BzuLocal(async_get_clientsession(hass), host, str(entry.data[CONF_CHIPID]))
+
+
+def get_power_factor(entry: ConfigEntry) -> float:
+    """Return the EP400 power factor, the options override the setup value."""
+    return entry.options.get(CONF_POWERFACTOR, entry.data.get(CONF_POWERFACTOR, 1.0))
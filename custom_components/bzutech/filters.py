@@ -0,0 +1,156 @@
+"""Include and exclude filters for the entities uploaded in send-all mode."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import fnmatch
+import re
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.event import (
+    async_track_state_added_domain,
+    async_track_state_removed_domain,
+)
+
+from .config_flow import get_all_entities
+from .const import CONF_EXCLUDE, CONF_INCLUDE, FILTER_FIELDS
+
+UPLOAD_DOMAINS = ("sensor", "switch", "light", "remote")
+
+
+def _compile(patterns: list[str]) -> re.Pattern[str] | None:
+    """Join glob patterns into one regular expression."""
+    if not patterns:
+        return None
+    return re.compile("|".join(fnmatch.translate(p.strip()) for p in patterns))
+
+
+class EntityFilter:
+    """Glob filters on entity_id, domain, device_class, area and integration.
+
+    An entity passes when it matches the include patterns of every field
+    that has them and none of the exclude patterns. Areas are matched by
+    area id and integrations by platform name.
+    """
+
+    def __init__(self, options: Mapping[str, Any]) -> None:
+        """Compile the patterns stored in the entry options."""
+        self.include = {
+            field: pattern
+            for field in FILTER_FIELDS
+            if (pattern := _compile(options.get(f"{CONF_INCLUDE}_{field}", [])))
+        }
+        self.exclude = {
+            field: pattern
+            for field in FILTER_FIELDS
+            if (pattern := _compile(options.get(f"{CONF_EXCLUDE}_{field}", [])))
+        }
+        self._needs_registry = any(
+            field in ("area", "integration") for field in (*self.include, *self.exclude)
+        )
+
+    @property
+    def empty(self) -> bool:
+        """Return True when no pattern is configured."""
+        return not self.include and not self.exclude
+
+    def filter(self, hass: HomeAssistant, entity_ids: list[str]) -> list[str]:
+        """Return the entities allowed by the filter."""
+        if self.empty:
+            return entity_ids
+        entities = er.async_get(hass) if self._needs_registry else None
+        devices = dr.async_get(hass) if self._needs_registry else None
+        return [
+            entity_id
+            for entity_id in entity_ids
+            if self._matches(self._values(hass, entities, devices, entity_id))
+        ]
+
+    def _values(
+        self,
+        hass: HomeAssistant,
+        entities: er.EntityRegistry | None,
+        devices: dr.DeviceRegistry | None,
+        entity_id: str,
+    ) -> dict[str, str]:
+        values = {"entity_id": entity_id, "domain": entity_id.split(".")[0]}
+        if "device_class" in self.include or "device_class" in self.exclude:
+            state = hass.states.get(entity_id)
+            if state is not None:
+                values["device_class"] = state.attributes.get("device_class", "")
+        if entities is not None and (entry := entities.async_get(entity_id)):
+            values["integration"] = entry.platform
+            area_id = entry.area_id
+            if area_id is None and entry.device_id and devices is not None:
+                if device := devices.async_get(entry.device_id):
+                    area_id = device.area_id
+            values["area"] = area_id or ""
+        return values
+
+    def _matches(self, values: dict[str, str]) -> bool:
+        for field, pattern in self.include.items():
+            if not pattern.match(values.get(field, "")):
+                return False
+        return not any(
+            pattern.match(values.get(field, ""))
+            for field, pattern in self.exclude.items()
+        )
+
+
+class UploadSet:
+    """Entities uploaded in send-all mode.
+
+    The list is computed once and kept until an uploadable entity is added
+    or removed, or the entity, device or area registry changes.
+    """
+
+    def __init__(self, hass: HomeAssistant, entity_filter: EntityFilter) -> None:
+        """Set up the upload set."""
+        self.hass = hass
+        self.entity_filter = entity_filter
+        self._entities: list[str] | None = None
+
+    @property
+    def entities(self) -> list[str]:
+        """Return the filtered entities, computing them when needed."""
+        if self._entities is None:
+            self._entities = self.entity_filter.filter(
+                self.hass, get_all_entities(self.hass)
+            )
+        return self._entities
+
+    @callback
+    def invalidate(self, *_: Any) -> None:
+        """Forget the computed entities."""
+        self._entities = None
+
+    @callback
+    def async_setup(self) -> CALLBACK_TYPE:
+        """Listen to the changes that affect the upload set."""
+        self.invalidate()
+        unsubs = [
+            async_track_state_added_domain(self.hass, UPLOAD_DOMAINS, self.invalidate),
+            async_track_state_removed_domain(
+                self.hass, UPLOAD_DOMAINS, self.invalidate
+            ),
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self.invalidate
+            ),
+            self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self.invalidate
+            ),
+            self.hass.bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, self.invalidate),
+        ]
+
+        @callback
+        def async_unsubscribe() -> None:
+            for unsub in unsubs:
+                unsub()
+
+        return async_unsubscribe
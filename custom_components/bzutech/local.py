@@ -0,0 +1,64 @@
+"""Local HTTP transport to Bzu gateways on the LAN."""
+
+from __future__ import annotations
+
+import logging
+import time
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+_LOGGER = logging.getLogger(__name__)
+
+LOCAL_TIMEOUT = ClientTimeout(total=3)
+LOCAL_RETRY = 300
+
+
+class BzuLocal:
+    """Read the channels of a port straight from the gateway.
+
+    The gateway answers ``GET /readings?port=<port>`` with
+    ``{"chipid": "<chip id>", "readings": {"SHT20-TMP-1": 23.4, ...}}``,
+    using the channel names of ``ENDPOINT_SENSORS``. When the gateway does
+    not answer, the local path is skipped for ``LOCAL_RETRY`` seconds and
+    the coordinator keeps polling the cloud.
+    """
+
+    def __init__(self, session: ClientSession, host: str, chipid: str) -> None:
+        """Set up the transport."""
+        self.session = session
+        self.host = host
+        self.chipid = chipid
+        self._retry_at = 0.0
+
+    @property
+    def available(self) -> bool:
+        """Return False while waiting to retry an unreachable gateway."""
+        return time.monotonic() >= self._retry_at
+
+    async def async_get_readings(self, port: str) -> dict[str, float] | None:
+        """Return the readings of a port, or None when the gateway is unreachable."""
+        try:
+            async with self.session.get(
+                f"http://{self.host}/readings",
+                params={"port": port},
+                timeout=LOCAL_TIMEOUT,
+            ) as resp:
+                resp.raise_for_status()
+                resposta = await resp.json()
+            if str(resposta["chipid"]) != self.chipid:
+                raise ValueError(f"{self.host} is the gateway {resposta['chipid']}")
+            readings = {
+                name: float(value) for name, value in resposta["readings"].items()
+            }
+        except (ClientError, TimeoutError, KeyError, TypeError, ValueError) as error:
+            if self.available:
+                _LOGGER.info(
+                    "Gateway %s not reachable at %s, using the cloud: %s",
+                    self.chipid,
+                    self.host,
+                    error,
+                )
+            self._retry_at = time.monotonic() + LOCAL_RETRY
+            return None
+        self._retry_at = 0.0
+        return readings
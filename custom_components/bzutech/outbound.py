@@ -0,0 +1,144 @@
+"""Prioritized MQTT publishing to Bzu Cloud."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+import logging
+import time
+from typing import Any
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DATA_OUTBOUND, DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+LANE_ALERT = "alert"
+LANE_COMMAND = "command"
+LANE_MANIFEST = "manifest"
+LANE_BULK = "bulk"
+
+
+class Lane:
+    """Messages of one priority with their QoS and rate budget.
+
+    The budget is a token bucket of ``burst`` messages refilled at ``rate``
+    messages per second, a lane without rate is never throttled. A lane with
+    ``maxlen`` drops its oldest messages when the broker falls behind.
+    """
+
+    def __init__(
+        self,
+        qos: int,
+        rate: float | None = None,
+        burst: int = 1,
+        maxlen: int | None = None,
+    ) -> None:
+        """Set up an empty lane with a full budget."""
+        self.qos = qos
+        self.rate = rate
+        self.burst = burst
+        self.queue: deque[tuple[str, Any]] = deque(maxlen=maxlen)
+        self.dropped = 0
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def append(self, topic: str, payload: Any) -> None:
+        """Queue a message, counting the one pushed out of a full lane."""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append((topic, payload))
+
+    def take(self, now: float) -> float:
+        """Spend one message of the budget, or return the seconds to wait."""
+        if self.rate is None:
+            return 0
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+        return (1 - self._tokens) / self.rate
+
+
+class OutboundQueue:
+    """Publish the messages of every lane from a single task.
+
+    Each time the broker is free the highest priority lane with a message
+    and budget left is published first, so an alert never waits behind a
+    bulk snapshot or a replay of buffered readings. Only the bulk lane drops
+    messages, the channel manifest lane is delivered in full and ahead of
+    the snapshots using its channels. The task starts with the first
+    message and ends with Home Assistant.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Set up the lanes in priority order."""
+        self.hass = hass
+        self.lanes = {
+            LANE_ALERT: Lane(qos=1),
+            LANE_COMMAND: Lane(qos=1, rate=20, burst=20),
+            LANE_MANIFEST: Lane(qos=1, rate=5, burst=5),
+            LANE_BULK: Lane(qos=0, rate=2, burst=5, maxlen=100),
+        }
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    @callback
+    def publish(self, lane: str, topic: str, payload: Any) -> None:
+        """Queue a message on a lane."""
+        self.lanes[lane].append(topic, payload)
+        self._wake.set()
+        if self._task is None or self._task.done():
+            self._task = self.hass.async_create_background_task(
+                self._async_drain(), f"{DOMAIN} outbound"
+            )
+
+    async def _async_drain(self) -> None:
+        while True:
+            wait: float | None = None
+            now = time.monotonic()
+            for name, lane in self.lanes.items():
+                if not lane.queue:
+                    continue
+                if delay := lane.take(now):
+                    wait = delay if wait is None else min(wait, delay)
+                    continue
+                topic, payload = lane.queue.popleft()
+                await self._async_publish(name, lane, topic, payload)
+                break
+            else:
+                self._wake.clear()
+                try:
+                    async with asyncio.timeout(wait):
+                        await self._wake.wait()
+                except TimeoutError:
+                    pass
+
+    async def _async_publish(
+        self, name: str, lane: Lane, topic: str, payload: Any
+    ) -> None:
+        if lane.dropped:
+            _LOGGER.warning(
+                "Bzu %s lane full, dropped %s old messages", name, lane.dropped
+            )
+            lane.dropped = 0
+        try:
+            await mqtt.async_publish(self.hass, topic, payload, lane.qos)
+        except HomeAssistantError as error:
+            _LOGGER.warning("Could not publish to %s: %s", topic, error)
+        except Exception:
+            _LOGGER.exception("Unexpected error publishing to %s", topic)
+
+
+@callback
+def async_get_outbound(hass: HomeAssistant) -> OutboundQueue:
+    """Return the outbound queue shared by the integration."""
+    if (outbound := hass.data.get(DATA_OUTBOUND)) is None:
+        outbound = hass.data[DATA_OUTBOUND] = OutboundQueue(hass)
+    return outbound
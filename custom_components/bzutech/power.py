@@ -0,0 +1,58 @@
+"""Derived power quantities for EP400 three phase endpoints."""
+
+from __future__ import annotations
+
+import math
+
+PHASES = ("A", "B", "C")
+VOLTAGE_CHANNELS = tuple(f"VR{phase}" for phase in PHASES)
+CURRENT_CHANNELS = tuple(f"CR{phase}" for phase in PHASES)
+RAW_CHANNELS = VOLTAGE_CHANNELS + CURRENT_CHANNELS
+
+
+class PowerEngine:
+    """Compute power and energy for every phase from voltage and current.
+
+    The Bzu cloud only exposes RMS voltage and current for the ADS7878, so
+    active and reactive power use the power factor configured for the port.
+    Energy is integrated per phase with the trapezoidal rule between refreshes.
+    """
+
+    def __init__(self, power_factor: float = 1.0) -> None:
+        """Set up the engine."""
+        self.power_factor = power_factor
+        self.energy = [0.0] * len(PHASES)
+        self._last_power: list[float] | None = None
+        self._last_time = 0.0
+
+    def compute(
+        self, voltages: list[float], currents: list[float], now: float
+    ) -> dict[str, float]:
+        """Return the derived values keyed like the EP400 channels."""
+        reactive_factor = math.sqrt(max(0.0, 1 - self.power_factor**2))
+        apparent = [v * i for v, i in zip(voltages, currents, strict=True)]
+        active = [s * self.power_factor for s in apparent]
+        reactive = [s * reactive_factor for s in apparent]
+
+        if self._last_power is not None:
+            hours = (now - self._last_time) / 3600
+            self.energy = [
+                energy + (before + after) / 2 * hours / 1000
+                for energy, before, after in zip(
+                    self.energy, self._last_power, active, strict=True
+                )
+            ]
+        self._last_power = active
+        self._last_time = now
+
+        values: dict[str, float] = {}
+        for index, phase in enumerate(PHASES):
+            values[f"AP{phase}"] = round(apparent[index], 2)
+            values[f"PP{phase}"] = round(active[index], 2)
+            values[f"RP{phase}"] = round(reactive[index], 2)
+            values[f"EN{phase}"] = round(self.energy[index], 4)
+        values["APT"] = round(sum(apparent), 2)
+        values["PPT"] = round(sum(active), 2)
+        values["RPT"] = round(sum(reactive), 2)
+        values["ENT"] = round(sum(self.energy), 4)
+        return values
@@ -0,0 +1,86 @@
+"""Timing spans around the hot paths of the integration."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+import cProfile
+import time
+
+FORMAT_COLLAPSED = "collapsed"
+FORMAT_PSTATS = "pstats"
+
+_NULL_SPAN = nullcontext()
+_stack: ContextVar[tuple[str, ...]] = ContextVar("bzutech_profile_stack", default=())
+
+
+class Profiler:
+    """Collect spans while a profile is running.
+
+    ``span`` only checks a flag and returns a shared null context when the
+    profiler is idle, so the instrumented code pays almost nothing. Spans are
+    kept per asyncio task through a context variable and written as
+    collapsed stacks, the input format of flamegraph tools. The ``pstats``
+    format runs cProfile on the event loop thread instead.
+    """
+
+    def __init__(self) -> None:
+        """Set up an idle profiler."""
+        self.active = False
+        self.format = FORMAT_COLLAPSED
+        self._inclusive: dict[tuple[str, ...], float] = defaultdict(float)
+        self._profile: cProfile.Profile | None = None
+
+    def span(self, name: str) -> AbstractContextManager[None]:
+        """Return a context manager timing ``name`` when profiling."""
+        if not self.active or self._profile is not None:
+            return _NULL_SPAN
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str) -> Iterator[None]:
+        stack = (*_stack.get(), name)
+        token = _stack.set(stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._inclusive[stack] += time.perf_counter() - start
+            _stack.reset(token)
+
+    def start(self, profile_format: str = FORMAT_COLLAPSED) -> None:
+        """Start recording, dropping the data of an unfinished profile."""
+        self._profile = None
+        self._inclusive.clear()
+        self.format = profile_format
+        if profile_format == FORMAT_PSTATS:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.active = True
+
+    def stop(self) -> None:
+        """Stop recording, keeping the collected data until the next start."""
+        self.active = False
+        if self._profile is not None:
+            self._profile.disable()
+
+    def write(self, path: str) -> None:
+        """Write the last profile to ``path``."""
+        if self.format == FORMAT_PSTATS:
+            if self._profile is not None:
+                self._profile.dump_stats(path)
+                self._profile = None
+            return
+
+        children: dict[tuple[str, ...], float] = defaultdict(float)
+        for stack, elapsed in self._inclusive.items():
+            children[stack[:-1]] += elapsed
+        with open(path, "w", encoding="utf-8") as file:
+            for stack, elapsed in sorted(self._inclusive.items()):
+                own = max(0.0, elapsed - children[stack])
+                file.write(f"{';'.join(stack)} {round(own * 1000000)}\n")
+
+
+PROFILER = Profiler()
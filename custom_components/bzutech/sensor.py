@@ -1,10 +1,12 @@
 """Sensor for BZUTech integration."""
 
-from datetime import timedelta
+from datetime import datetime, timedelta
+import time
 
 from bzutech import BzuTech
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
     SensorEntity,
     SensorEntityDescription,
@@ -17,21 +19,35 @@ from homeassistant.const import (
     LIGHT_LUX,
     PERCENTAGE,
     SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfApparentPower,
     UnitOfElectricCurrent,
     UnitOfElectricPotential,
+    UnitOfEnergy,
     UnitOfInformation,
+    UnitOfPower,
+    UnitOfReactivePower,
     UnitOfSoundPressure,
     UnitOfTemperature,
-    UnitOfTime,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
-from .const import CONF_CHIPID, CONF_ENDPOINT, CONF_SENSORPORT, DOMAIN
+from .const import (
+    CONF_CHIPID,
+    CONF_DERIVEDPOWER,
+    CONF_ENDPOINT,
+    CONF_SENSORPORT,
+    DOMAIN,
+)
+from .coordinator import BzuCoordinator, Ep400Coordinator
+from .power import PHASES, RAW_CHANNELS
 
-SCAN_INTERVAL = timedelta(minutes=5)
+HOURLY_WRITE = 3600
+BOOT_TOLERANCE = timedelta(seconds=30)
 
 SENSOR_TYPE: tuple[SensorEntityDescription, ...] = (
     SensorEntityDescription(
@@ -225,21 +241,66 @@ SENSOR_TYPE: tuple[SensorEntityDescription, ...] = (
         device_class=SensorDeviceClass.SIGNAL_STRENGTH,
         native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
         state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
     ),
     SensorEntityDescription(
         key="MEM",
         device_class=SensorDeviceClass.DATA_SIZE,
         native_unit_of_measurement=UnitOfInformation.KILOBYTES,
         state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
     ),
+    # The gateway uptime in milliseconds, exposed as the boot time.
     SensorEntityDescription(
         key="UPT",
-        device_class=SensorDeviceClass.DURATION,
-        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
-        state_class=SensorStateClass.MEASUREMENT,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_category=EntityCategory.DIAGNOSTIC,
+    ),
+)
+
+DERIVED_SENSOR_TYPE: tuple[SensorEntityDescription, ...] = (
+    *(
+        SensorEntityDescription(
+            key=f"AP{phase}",
+            device_class=SensorDeviceClass.APPARENT_POWER,
+            native_unit_of_measurement=UnitOfApparentPower.VOLT_AMPERE,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        for phase in (*PHASES, "T")
+    ),
+    *(
+        SensorEntityDescription(
+            key=f"PP{phase}",
+            device_class=SensorDeviceClass.POWER,
+            native_unit_of_measurement=UnitOfPower.WATT,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        for phase in (*PHASES, "T")
+    ),
+    *(
+        SensorEntityDescription(
+            key=f"RP{phase}",
+            device_class=SensorDeviceClass.REACTIVE_POWER,
+            native_unit_of_measurement=UnitOfReactivePower.VOLT_AMPERE_REACTIVE,
+            state_class=SensorStateClass.MEASUREMENT,
+        )
+        for phase in (*PHASES, "T")
+    ),
+    *(
+        SensorEntityDescription(
+            key=f"EN{phase}",
+            device_class=SensorDeviceClass.ENERGY,
+            native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+            state_class=SensorStateClass.TOTAL_INCREASING,
+        )
+        for phase in (*PHASES, "T")
     ),
 )
 
+SENSOR_DESCRIPTIONS = {description.key: description for description in SENSOR_TYPE}
+
 ENDPOINT_SENSORS = {
     "EP101": ["SHT20-TMP", "SHT20-HUM", "BH1750-LUM"],
     "EP111": ["SHT20-TMP", "SHT20-HUM", "BH1750-LUM", "SHT30-TMP", "SHT30-HUM"],
@@ -278,6 +339,8 @@ ENDPOINT_SENSORS = {
     ],
 }
 
+GATEWAY_SENSORS = ["GATEWAY-DBM", "GATEWAY-MEM", "GATEWAY-UPT"]
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -286,57 +349,170 @@ async def async_setup_entry(
 ) -> None:
     """Do entry Setup."""
     bzu_api = hass.data[DOMAIN][entry.entry_id]
-    sensors = [
-        BzuSensorEntity(
-            bzu_api, f"{sensor}-{entry.data[CONF_SENSORPORT]}", entry, description
-        )
-        for sensor in ENDPOINT_SENSORS[entry.data[CONF_ENDPOINT]]
-        for description in SENSOR_TYPE
-        if description.key == sensor.split("-")[1]
+    sensors = get_sensors(entry, bzu_api)
+    polled = [
+        sensorname
+        for sensorname, description in sensors
+        if description not in DERIVED_SENSOR_TYPE
     ]
+    coordinator: BzuCoordinator
+    if entry.data[CONF_ENDPOINT] == "EP400" and entry.data.get(CONF_DERIVEDPOWER):
+        coordinator = Ep400Coordinator(hass, bzu_api, entry, polled)
+    else:
+        coordinator = BzuCoordinator(hass, bzu_api, entry, polled)
+
+    await coordinator.async_config_entry_first_refresh()
+    entry.async_on_unload(entry.add_update_listener(coordinator.async_options_updated))
+    device_info = get_device_info(entry)
+    async_add_entities(
+        get_entity_class(description)(
+            coordinator, sensorname, description, device_info
+        )
+        for sensorname, description in sensors
+    )
+
+
+def get_sensors(
+    entry: ConfigEntry, api: BzuTech | None
+) -> list[tuple[str, SensorEntityDescription]]:
+    """Return the channel names and descriptions of a gateway port.
+
+    The gateway diagnostics are not part of an endpoint, they are added when
+    the cloud lists them on the port.
+    """
+    port = entry.data[CONF_SENSORPORT]
+    sensors: list[tuple[str, SensorEntityDescription]]
+    if entry.data[CONF_ENDPOINT] == "EP400" and entry.data.get(CONF_DERIVEDPOWER):
+        raw = [SENSOR_DESCRIPTIONS[key] for key in RAW_CHANNELS]
+        sensors = [
+            (f"ADS7878-{description.key}-{port}", description)
+            for description in (*raw, *DERIVED_SENSOR_TYPE)
+        ]
+    else:
+        sensors = [
+            (f"{sensor}-{port}", SENSOR_DESCRIPTIONS[sensor.split("-")[1]])
+            for sensor in ENDPOINT_SENSORS[entry.data[CONF_ENDPOINT]]
+            if sensor.split("-")[1] in SENSOR_DESCRIPTIONS
+        ]
 
-    async_add_entities(sensors, update_before_add=True)
+    device = None
+    if api is not None and api.dispositivos is not None:
+        device = api.dispositivos.get(str(entry.data[CONF_CHIPID]))
+    if device is not None:
+        for channel in GATEWAY_SENSORS:
+            if f"{channel}-{port}" in device.sensores:
+                sensors.append(
+                    (f"{channel}-{port}", SENSOR_DESCRIPTIONS[channel.split("-")[1]])
+                )
+    return sensors
 
 
-class BzuSensorEntity(SensorEntity):
-    """Setup sensor entity."""
+def get_device_info(entry: ConfigEntry) -> DeviceInfo:
+    """Build the device of a gateway port."""
+    chipid = entry.data[CONF_CHIPID]
+    port = entry.data[CONF_SENSORPORT]
+    return DeviceInfo(
+        name=f"{chipid}-{port}",
+        identifiers={(DOMAIN, f"ESP-{chipid}")},
+        entry_type=DeviceEntryType("service"),
+        manufacturer="Bzu Tech",
+        model=f"ESP-{chipid}-{port}",
+        serial_number=f"{chipid}P{port}",
+    )
+
+
+class BzuSensorEntity(CoordinatorEntity[BzuCoordinator], SensorEntity):
+    """Setup sensor entity.
+
+    The gateway metadata lives in the coordinator and the device info is
+    built once per port and shared, each entity only keeps its channel name
+    as the key of its value in ``coordinator.data``.
+    """
 
     has_entity_name = True
+    _last_write: float | None = None
 
     def __init__(
         self,
-        api: BzuTech,
+        coordinator: BzuCoordinator,
         sensorname: str,
-        entry: ConfigEntry,
         description: SensorEntityDescription,
+        device_info: DeviceInfo,
     ) -> None:
         """Do Sensor configuration."""
+        super().__init__(coordinator)
         self._attr_unique_id = (
-            entry.data[CONF_CHIPID]
-            + sensorname.split("-")[1]
-            + entry.data[CONF_SENSORPORT]
+            f"{coordinator.chipid}{description.key}{coordinator.port}"
         )
-        self.chipid = entry.data[CONF_CHIPID]
         self.sensorname = sensorname
-        self.name = sensorname
-        self.api: BzuTech = api
+        self._attr_name = sensorname
         self.entity_description = description
         self._attr_translation_key = description.key
-        self._attr_device_info = DeviceInfo(
-            name=f"{self.chipid}-{entry.data[CONF_SENSORPORT]}",
-            identifiers={(DOMAIN, f"ESP-{self.chipid}")},
-            entry_type=DeviceEntryType("service"),
-            manufacturer="Bzu Tech",
-            model=f"ESP-{self.chipid}-{entry.data[CONF_SENSORPORT]}",
-            serial_number=f"{self.chipid}P{entry.data[CONF_SENSORPORT]}",
-        )
+        self._attr_device_info = device_info
+
+    @property
+    def available(self) -> bool:
+        """Return if the last refresh had a reading for this channel."""
+        return super().available and self.native_value is not None
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the reading of the last refresh."""
+        return self.coordinator.data.get(self.sensorname)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state, at most once an hour for the hourly channels."""
+        if self.sensorname in self.coordinator.hourly:
+            now = time.monotonic()
+            if self._last_write is not None and now - self._last_write < HOURLY_WRITE:
+                return
+            self._last_write = now
+        super()._handle_coordinator_update()
+
+
+class BzuBootTimeSensorEntity(BzuSensorEntity):
+    """Gateway uptime reported as the time of the last boot.
 
-    async def async_update(self) -> None:
-        """Update entity values, the bzutech webapi does not have a endpoint to get every sensor value at once, so each entity need to poll."""
+    The boot time computed from each reading moves with the poll latency,
+    it is only replaced when it drifts more than ``BOOT_TOLERANCE``, so the
+    state changes on a reboot instead of on every poll.
+    """
+
+    _boot: datetime | None = None
+
+    @property
+    def native_value(self) -> datetime | None:
+        """Return the boot time of the gateway."""
+        if (uptime := self.coordinator.data.get(self.sensorname)) is None:
+            return None
+        boot = dt_util.utcnow() - timedelta(milliseconds=uptime)
+        if self._boot is None or abs(boot - self._boot) > BOOT_TOLERANCE:
+            self._boot = boot.replace(microsecond=0)
+        return self._boot
+
+
+class BzuEnergySensorEntity(BzuSensorEntity, RestoreSensor):
+    """EP400 energy total that continues from its value before a restart."""
+
+    coordinator: Ep400Coordinator
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last total into the power engine."""
+        await super().async_added_to_hass()
+        if (last := await self.async_get_last_sensor_data()) is None:
+            return
         try:
-            self._attr_native_value = await self.api.get_reading(
-                str(self.chipid), self.sensorname
-            )
-        except (KeyError, TypeError) as error:
-            await self.api.start()
-            raise UpdateFailed(error) from error
+            value = float(last.native_value)
+        except (TypeError, ValueError):
+            return
+        self.coordinator.async_restore_energy(self.entity_description.key, value)
+
+
+def get_entity_class(description: SensorEntityDescription) -> type[BzuSensorEntity]:
+    """Return the entity class of a channel."""
+    if description.key == "UPT":
+        return BzuBootTimeSensorEntity
+    if description in DERIVED_SENSOR_TYPE and description.key.startswith("EN"):
+        return BzuEnergySensorEntity
+    return BzuSensorEntity
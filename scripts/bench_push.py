@@ -0,0 +1,204 @@
+"""Benchmark the Bzu Cloud push path with synthetic entities.
+
+Fills a Home Assistant instance with sensor, switch and light states, runs
+``BzuBinarySensorEntity.async_update`` against a fake MQTT client and prints
+one JSON document with the results, so runs can be compared over time::
+
+    python scripts/bench_push.py --sizes 1000 10000 50000 --cycles 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+from pathlib import Path
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.components import mqtt  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.bzutech import binary_sensor  # noqa: E402
+from custom_components.bzutech.config_flow import (  # noqa: E402
+    get_all_entities,
+    get_sensortype,
+)
+from custom_components.bzutech.const import (  # noqa: E402
+    CONF_CHIPID,
+    CONF_ENTITY,
+    CONF_SENDALL,
+    CONF_SENSORNAME,
+)
+
+DEVICE_CLASSES = ("temperature", "humidity", "voltage", "current", "battery")
+
+
+class FakeMqtt:
+    """Record what the push path queues instead of sending it."""
+
+    def __init__(self) -> None:
+        """Set up an empty recorder."""
+        self.messages: list[tuple[str, Any]] = []
+
+    def publish(self, lane: str, topic: str, payload: Any) -> None:
+        """Keep the queued message."""
+        self.messages.append((topic, payload))
+
+    async def async_wait_for_mqtt_client(self, hass: HomeAssistant) -> bool:
+        """Pretend the broker is connected."""
+        return True
+
+    def payload_bytes(self) -> int:
+        """Return the size of every recorded payload."""
+        return sum(len(str(payload).encode()) for _, payload in self.messages)
+
+
+def populate(hass: HomeAssistant, size: int) -> list[str]:
+    """Create ``size`` synthetic states, 60% sensors, 25% switches, 15% lights."""
+    entity_ids = []
+    for index in range(size):
+        bucket = index % 20
+        if bucket < 12:
+            entity_id = f"sensor.bench_{index}"
+            attributes = {"device_class": DEVICE_CLASSES[index % len(DEVICE_CLASSES)]}
+            state = str(index % 100)
+        elif bucket < 17:
+            entity_id = f"switch.bench_{index}"
+            attributes = {}
+            state = "on" if index % 2 else "off"
+        else:
+            entity_id = f"light.bench_{index}"
+            attributes = {}
+            state = "on" if index % 2 else "off"
+        hass.states.async_set(entity_id, state, attributes)
+        entity_ids.append(entity_id)
+    return entity_ids
+
+
+def build_entity(
+    hass: HomeAssistant, entity_ids: list[str], sendall: bool, fake: FakeMqtt
+) -> binary_sensor.BzuBinarySensorEntity:
+    """Create the push entity with the cloud subscriptions already in place."""
+    entry = SimpleNamespace(
+        data={
+            CONF_SENDALL: int(sendall),
+            CONF_ENTITY: [] if sendall else entity_ids,
+            CONF_CHIPID: "HA-1234567",
+            CONF_SENSORNAME: "Bzu Cloud",
+        },
+        options={},
+    )
+    entity = binary_sensor.BzuBinarySensorEntity(hass, None, entry)
+    entity.hass = hass
+    entity.outbound = fake
+    entity.subscribed = True
+    return entity
+
+
+async def measure(
+    hass: HomeAssistant, entity_ids: list[str], sendall: bool, cycles: int
+) -> dict[str, Any]:
+    """Measure time, memory and payload size of the push cycle."""
+    fake = FakeMqtt()
+    entity = build_entity(hass, entity_ids, sendall, fake)
+    with (
+        patch.object(
+            mqtt, "async_wait_for_mqtt_client", fake.async_wait_for_mqtt_client
+        ),
+        patch.object(binary_sensor, "log_entry"),
+    ):
+        # The first cycle announces every channel, measure the steady state.
+        await entity.async_update()
+
+        times = []
+        payload_bytes = []
+        for _ in range(cycles):
+            fake.messages.clear()
+            gc.collect()
+            start = time.perf_counter()
+            await entity.async_update()
+            times.append(time.perf_counter() - start)
+            payload_bytes.append(fake.payload_bytes())
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        await entity.async_update()
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    # Objects still alive after the cycle, the peak covers the transient ones.
+    retained = sum(
+        stat.count_diff
+        for stat in after.compare_to(before, "lineno")
+        if stat.count_diff > 0
+    )
+    return {
+        "cycle_seconds_min": min(times),
+        "cycle_seconds_mean": sum(times) / len(times),
+        "peak_memory_bytes": peak,
+        "retained_objects": retained,
+        "payload_bytes": max(payload_bytes),
+    }
+
+
+async def run(sizes: list[int], cycles: int) -> list[dict[str, Any]]:
+    """Run every size in a fresh Home Assistant instance."""
+    results = []
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as config_dir:
+            hass = HomeAssistant(config_dir)
+            entity_ids = populate(hass, size)
+
+            start = time.perf_counter()
+            get_all_entities(hass)
+            all_entities_seconds = time.perf_counter() - start
+            start = time.perf_counter()
+            for entity_id in entity_ids:
+                get_sensortype(hass, entity_id)
+            sensortype_seconds = time.perf_counter() - start
+
+            for mode, sendall in (("send_all", True), ("explicit_list", False)):
+                result = {
+                    "entities": size,
+                    "mode": mode,
+                    "cycles": cycles,
+                    "get_all_entities_seconds": all_entities_seconds,
+                    "get_sensortype_seconds": sensortype_seconds,
+                }
+                result.update(await measure(hass, entity_ids, sendall, cycles))
+                results.append(result)
+            await hass.async_stop(force=True)
+    return results
+
+
+def main() -> None:
+    """Parse the arguments and print the results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="write the JSON to a file")
+    args = parser.parse_args()
+
+    document = json.dumps(
+        {"benchmark": "push", "results": asyncio.run(run(args.sizes, args.cycles))},
+        indent=2,
+    )
+    if args.output:
+        args.output.write_text(document + "\n", encoding="utf-8")
+    else:
+        print(document)  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Stand-in for a Bzu gateway answering the LAN readings API.
+
+Serves ``GET /readings?port=<port>`` with synthetic values for the channels
+of ``ENDPOINT_SENSORS``, so the local transport and its cloud fallback can be
+tried without hardware. Set the emulator address as the gateway LAN address
+in the options of a port::
+
+    python scripts/gateway_emulator.py --chipid 1234567 --endpoint 1=EP101 2=EP400
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import random
+import sys
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from custom_components.bzutech.sensor import ENDPOINT_SENSORS  # noqa: E402
+
+BASE_VALUES = {
+    "TMP": 24.0,
+    "HUM": 55.0,
+    "LUM": 300.0,
+    "DOR": 0.0,
+    "VOC": 0.4,
+    "CO2": 450.0,
+    "SND": 40.0,
+    "VRA": 127.0,
+    "VRB": 127.0,
+    "VRC": 127.0,
+    "CRA": 5.0,
+    "CRB": 4.0,
+    "CRC": 3.0,
+}
+
+
+def build_app(chipid: str, endpoints: dict[str, str], fail: bool) -> web.Application:
+    """Create the web application of the emulated gateway."""
+
+    async def readings(request: web.Request) -> web.Response:
+        if fail:
+            raise web.HTTPServiceUnavailable
+        port = request.query.get("port", "")
+        if port not in endpoints:
+            raise web.HTTPNotFound
+        values = {}
+        for sensor in ENDPOINT_SENSORS[endpoints[port]]:
+            base = BASE_VALUES.get(sensor.split("-")[1], 10.0)
+            values[f"{sensor}-{port}"] = round(base * random.uniform(0.95, 1.05), 2)
+        return web.json_response({"chipid": chipid, "readings": values})
+
+    app = web.Application()
+    app.router.add_get("/readings", readings)
+    return app
+
+
+def main() -> None:
+    """Parse the arguments and serve the emulated gateway."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chipid", required=True)
+    parser.add_argument(
+        "--endpoint",
+        nargs="+",
+        default=["1=EP101"],
+        help="port=endpoint pairs, for example 1=EP101 2=EP400",
+    )
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--fail", action="store_true", help="answer 503 to test the cloud fallback"
+    )
+    args = parser.parse_args()
+
+    endpoints = dict(pair.split("=", 1) for pair in args.endpoint)
+    web.run_app(
+        build_app(args.chipid, endpoints, args.fail), host=args.host, port=args.port
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Fixtures for the BZUTech tests."""
+
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from pathlib import Path
+import sys
+
+from aiohttp.test_utils import TestServer
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+from gateway_emulator import build_app  # noqa: E402
+
+CHIPID = "1234567"
+
+
+@pytest.fixture
+async def gateway(
+    socket_enabled: None,
+) -> AsyncGenerator[Callable[..., Awaitable[str]]]:
+    """Start emulated gateways with an EP101 on port 1, return their address."""
+    servers: list[TestServer] = []
+
+    async def start(chipid: str = CHIPID, fail: bool = False) -> str:
+        server = TestServer(build_app(chipid, {"1": "EP101"}, fail))
+        await server.start_server()
+        servers.append(server)
+        return f"{server.host}:{server.port}"
+
+    yield start
+    for server in servers:
+        await server.close()
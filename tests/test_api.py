@@ -0,0 +1,122 @@
+"""Tests for the shared BzuTech client."""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+
+from custom_components.bzutech.api import (
+    API_URL,
+    RESTART_COOLDOWN,
+    BzuTechClient,
+    async_get_client,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .conftest import CHIPID
+
+
+async def test_restart_runs_once_for_concurrent_callers() -> None:
+    """Test ports failing together share one login and discovery."""
+    client = BzuTechClient(AsyncMock(), "user@example.com", "secret")
+
+    async def slow_start() -> bool:
+        await asyncio.sleep(0)
+        return True
+
+    with (
+        patch.object(client, "start", AsyncMock(side_effect=slow_start)) as start,
+        patch("custom_components.bzutech.api.time.monotonic", return_value=1000),
+    ):
+        await asyncio.gather(*(client.async_restart() for _ in range(200)))
+        assert start.await_count == 1
+
+    with (
+        patch.object(client, "start", AsyncMock(return_value=True)) as start,
+        patch(
+            "custom_components.bzutech.api.time.monotonic",
+            return_value=1000 + RESTART_COOLDOWN,
+        ),
+    ):
+        await client.async_restart()
+        assert start.await_count == 1
+
+
+async def test_client_uses_the_shared_session(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test login, discovery and readings go through Home Assistant's session."""
+    aioclient_mock.post(
+        f"{API_URL}/auth/login/", json={"tokens": {"access": "token"}, "id": 7}
+    )
+    aioclient_mock.get(
+        f"{API_URL}/operador/navbar/7", json={"empresas": [{"contratos_id": 3}]}
+    )
+    aioclient_mock.get(
+        f"{API_URL}/dispositivos/listar/3",
+        json=[
+            {
+                "status_dispositivo": 1,
+                "boot_chip_id": CHIPID,
+                "dispname": None,
+                "dispnum": "Gateway",
+            },
+            {
+                "status_dispositivo": 0,
+                "boot_chip_id": "7654321",
+                "dispname": "Off",
+                "dispnum": "Off",
+            },
+        ],
+    )
+    aioclient_mock.get(
+        f"{API_URL}/dispositivos/canais-list/{CHIPID}",
+        json=[
+            {
+                "sensor_nome": "sht20-tmp-1",
+                "apelido_canal": "Temperature",
+                "ultima_medicao_sensor": 21,
+            },
+            {
+                "sensor_nome": "SHT20-HUM-1",
+                "apelido_canal": "Humidity",
+                "ultima_medicao_sensor": None,
+            },
+        ],
+    )
+    aioclient_mock.get(
+        f"{API_URL}/logs/ultima_medicao/11234567/10020", json={"medicao": 21500000}
+    )
+
+    client = await async_get_client(hass, "user@example.com", "secret")
+
+    assert client is not None
+    assert list(client.dispositivos) == [CHIPID]
+    assert client.dispositivos[CHIPID].dispname == "Gateway"
+    assert list(client.dispositivos[CHIPID].sensores) == ["SHT20-TMP-1"]
+    assert await client.get_reading(CHIPID, "sht20-tmp-1") == 21.5
+    assert aioclient_mock.call_count == 5
+    method, url, data, headers = aioclient_mock.mock_calls[0]
+    assert data == {"operador_email": "user@example.com", "password": "secret"}
+    for method, url, data, headers in aioclient_mock.mock_calls[1:]:
+        assert headers == {"Authorization": "Bearer token"}
+    assert await async_get_client(hass, "user@example.com", "secret") is client
+    assert aioclient_mock.call_count == 5
+
+
+async def test_failed_login(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test a refused login is reported without discovering devices."""
+    aioclient_mock.post(
+        f"{API_URL}/auth/login/", json={"detail": "No active account"}, status=401
+    )
+
+    client = BzuTechClient(async_get_clientsession(hass), "user@example.com", "x")
+    assert await client.start() is False
+    assert client.dispositivos is None
+    assert await async_get_client(hass, "user@example.com", "wrong") is None
+    assert aioclient_mock.call_count == 2
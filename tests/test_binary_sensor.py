@@ -0,0 +1,46 @@
+"""Tests for the Bzu Cloud push entity."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from custom_components.bzutech.binary_sensor import BzuBinarySensorEntity
+from custom_components.bzutech.const import (
+    CONF_CHIPID,
+    CONF_ENTITY,
+    CONF_SENDALL,
+    CONF_SENSORNAME,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+
+async def test_overlapping_upload_is_skipped(hass: HomeAssistant) -> None:
+    """Test a tick is skipped while the previous upload is running."""
+    entry = SimpleNamespace(
+        data={
+            CONF_SENDALL: 1,
+            CONF_ENTITY: [],
+            CONF_CHIPID: "HA-1234567",
+            CONF_SENSORNAME: "Bzu Cloud",
+        },
+        options={},
+    )
+    entity = BzuBinarySensorEntity(hass, None, entry)
+    release = asyncio.Event()
+    uploads = 0
+
+    async def slow_upload(force_refresh: bool = False) -> None:
+        nonlocal uploads
+        uploads += 1
+        await release.wait()
+
+    with patch.object(entity, "async_update_ha_state", slow_upload):
+        first = hass.async_create_task(entity._async_upload(dt_util.utcnow()))
+        await asyncio.sleep(0)
+        await entity._async_upload(dt_util.utcnow())
+        release.set()
+        await first
+        await entity._async_upload(dt_util.utcnow())
+
+    assert uploads == 2
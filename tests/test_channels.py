@@ -0,0 +1,25 @@
+"""Tests for the channel manifest."""
+
+from custom_components.bzutech.channels import ChannelManifest
+from homeassistant.core import HomeAssistant
+
+
+async def test_remapped_channel_is_announced(hass: HomeAssistant) -> None:
+    """Test a ref moving to another entity is announced and stored."""
+    manifest = ChannelManifest(hass, "HA-1234567")
+    manifest.update({"HA-TMP-1955": "sensor.kitchen_temp"})
+
+    added, removed = manifest.update({"HA-TMP-1955": "sensor.temp_kitchen"})
+
+    assert (added, removed) == (["HA-TMP-1955"], [])
+    assert manifest.version == 2
+    assert manifest.channels == {"HA-TMP-1955": "sensor.temp_kitchen"}
+
+
+async def test_unchanged_channels_keep_the_version(hass: HomeAssistant) -> None:
+    """Test publishing the same channels does not bump the version."""
+    manifest = ChannelManifest(hass, "HA-1234567")
+    manifest.update({"HA-TMP-1955": "sensor.kitchen_temp"})
+
+    assert manifest.update({"HA-TMP-1955": "sensor.kitchen_temp"}) == ([], [])
+    assert manifest.version == 1
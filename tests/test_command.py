@@ -0,0 +1,170 @@
+"""Tests for the cloud command executor."""
+
+import asyncio
+import json
+
+from pytest_homeassistant_custom_component.common import async_mock_service
+
+from custom_components.bzutech.command import (
+    RESULT_DUPLICATE_ID,
+    RESULT_ERROR,
+    RESULT_INVALID_PAYLOAD,
+    RESULT_SUCCESS,
+    RESULT_TIMEOUT,
+    CommandExecutor,
+)
+from homeassistant.core import HomeAssistant, ServiceCall
+
+
+async def test_invalid_fields_get_a_reply(hass: HomeAssistant) -> None:
+    """Test malformed data or timeout fail their command and keep the reply."""
+    calls: list[ServiceCall] = async_mock_service(hass, "switch", "turn_on")
+    payload = {
+        "request_id": "r1",
+        "commands": [
+            {"id": "a", "entity": "switch.a", "method": "turn_on", "timeout": "x"},
+            {"id": "b", "entity": "switch.b", "method": "turn_on", "data": "abc"},
+            {"id": "c", "entity": "switch.c", "method": "turn_on"},
+        ],
+    }
+
+    reply = json.loads(await CommandExecutor(hass).async_handle(json.dumps(payload)))
+
+    assert reply == {
+        "request_id": "r1",
+        "results": {
+            "a": RESULT_INVALID_PAYLOAD,
+            "b": RESULT_INVALID_PAYLOAD,
+            "c": RESULT_SUCCESS,
+        },
+    }
+    assert [call.data["entity_id"] for call in calls] == [["switch.c"]]
+
+
+async def test_duplicate_ids_are_rejected(hass: HomeAssistant) -> None:
+    """Test commands sharing an id are not run."""
+    calls: list[ServiceCall] = async_mock_service(hass, "switch", "turn_on")
+    payload = {
+        "request_id": "r2",
+        "commands": [
+            {"id": "a", "entity": "switch.a", "method": "turn_on"},
+            {"id": "a", "entity": "switch.b", "method": "turn_on"},
+            {"id": "b", "entity": "switch.c", "method": "turn_on"},
+        ],
+    }
+
+    reply = json.loads(await CommandExecutor(hass).async_handle(json.dumps(payload)))
+
+    assert reply["results"] == {"a": RESULT_DUPLICATE_ID, "b": RESULT_SUCCESS}
+    assert [call.data["entity_id"] for call in calls] == [["switch.c"]]
+
+
+async def test_same_service_is_one_call(hass: HomeAssistant) -> None:
+    """Test commands with the same service and data become one call."""
+    calls: list[ServiceCall] = async_mock_service(hass, "light", "turn_on")
+    payload = {
+        "request_id": "r3",
+        "commands": [
+            {"id": "a", "entity": "light.a", "method": "turn_on"},
+            {"id": "b", "entity": ["light.b", "light.c"], "method": "turn_on"},
+            {
+                "id": "c",
+                "entity": "light.d",
+                "method": "turn_on",
+                "data": {"brightness": 10},
+            },
+        ],
+    }
+
+    reply = json.loads(await CommandExecutor(hass).async_handle(json.dumps(payload)))
+
+    assert reply["results"] == dict.fromkeys("abc", RESULT_SUCCESS)
+    assert sorted(
+        (call.data["entity_id"], call.data.get("brightness")) for call in calls
+    ) == [(["light.a", "light.b", "light.c"], None), (["light.d"], 10)]
+
+
+async def test_slow_command_times_out(hass: HomeAssistant) -> None:
+    """Test a command still running after its timeout gets RESULT_TIMEOUT."""
+    release = asyncio.Event()
+
+    async def stuck(call: ServiceCall) -> None:
+        await release.wait()
+
+    hass.services.async_register("switch", "turn_on", stuck)
+    payload = {
+        "request_id": "r4",
+        "commands": [
+            {"id": "a", "entity": "switch.a", "method": "turn_on", "timeout": 0.05}
+        ],
+    }
+
+    reply = json.loads(await CommandExecutor(hass).async_handle(json.dumps(payload)))
+    release.set()
+
+    assert reply["results"] == {"a": RESULT_TIMEOUT}
+
+
+async def test_concurrency_limit(hass: HomeAssistant) -> None:
+    """Test no more service calls than workers run at the same time."""
+    running = 0
+    peak = 0
+
+    async def slow(call: ServiceCall) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    hass.services.async_register("light", "turn_on", slow)
+    payload = {
+        "request_id": "r5",
+        "commands": [
+            {
+                "id": str(index),
+                "entity": f"light.l{index}",
+                "method": "turn_on",
+                "data": {"brightness": index},
+            }
+            for index in range(6)
+        ],
+    }
+
+    executor = CommandExecutor(hass, max_workers=2)
+    reply = json.loads(await executor.async_handle(json.dumps(payload)))
+
+    assert reply["results"] == {str(index): RESULT_SUCCESS for index in range(6)}
+    assert peak == 2
+
+
+async def test_legacy_payload_reply(hass: HomeAssistant) -> None:
+    """Test a single legacy command keeps the reply format of the cloud."""
+    async_mock_service(hass, "switch", "turn_on")
+    payload = {"entity": "switch.a", "method": "turn_on"}
+
+    reply = await CommandExecutor(hass).async_handle(json.dumps(payload))
+
+    assert reply == str({"info": RESULT_SUCCESS})
+
+
+async def test_unexpected_error_still_replies(hass: HomeAssistant) -> None:
+    """Test a service raising an unexpected error fails only its commands."""
+    lights: list[ServiceCall] = async_mock_service(hass, "light", "turn_on")
+
+    async def broken(call: ServiceCall) -> None:
+        raise KeyError("state")
+
+    hass.services.async_register("switch", "turn_on", broken)
+    payload = {
+        "request_id": "r6",
+        "commands": [
+            {"id": "a", "entity": "switch.a", "method": "turn_on"},
+            {"id": "b", "entity": "light.b", "method": "turn_on"},
+        ],
+    }
+
+    reply = json.loads(await CommandExecutor(hass).async_handle(json.dumps(payload)))
+
+    assert reply["results"] == {"a": RESULT_ERROR, "b": RESULT_SUCCESS}
+    assert len(lights) == 1
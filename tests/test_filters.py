@@ -0,0 +1,117 @@
+"""Tests for the send-all entity filters."""
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.bzutech.filters import EntityFilter, UploadSet
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+
+def _set_states(hass: HomeAssistant) -> None:
+    hass.states.async_set("sensor.kitchen_temp", "21", {"device_class": "temperature"})
+    hass.states.async_set("sensor.kitchen_hum", "50", {"device_class": "humidity"})
+    hass.states.async_set("sensor.outdoor_temp", "12", {"device_class": "temperature"})
+    hass.states.async_set("switch.pump", "on")
+
+
+async def test_include_and_exclude_across_fields(hass: HomeAssistant) -> None:
+    """Test an entity must match every include field and no exclude field."""
+    _set_states(hass)
+    ids = hass.states.async_entity_ids()
+
+    assert EntityFilter({}).filter(hass, ids) == ids
+    assert sorted(
+        EntityFilter(
+            {
+                "include_domain": ["sensor"],
+                "include_device_class": ["temp*"],
+                "exclude_entity_id": ["sensor.outdoor_*"],
+            }
+        ).filter(hass, ids)
+    ) == ["sensor.kitchen_temp"]
+    assert sorted(
+        EntityFilter({"exclude_device_class": ["humidity", "temperature"]}).filter(
+            hass, ids
+        )
+    ) == ["switch.pump"]
+
+
+async def test_area_and_integration(hass: HomeAssistant) -> None:
+    """Test areas are matched directly or through the device of the entity."""
+    config_entry = MockConfigEntry(domain="zha")
+    config_entry.add_to_hass(hass)
+    kitchen = ar.async_get(hass).async_create("Kitchen")
+    garage = ar.async_get(hass).async_create("Garage")
+    devices = dr.async_get(hass)
+    device = devices.async_get_or_create(
+        config_entry_id=config_entry.entry_id, identifiers={("zha", "plug")}
+    )
+    devices.async_update_device(device.id, area_id=kitchen.id)
+    entities = er.async_get(hass)
+    direct = entities.async_get_or_create("sensor", "mqtt", "direct")
+    entities.async_update_entity(direct.entity_id, area_id=kitchen.id)
+    by_device = entities.async_get_or_create(
+        "sensor", "zha", "by_device", device_id=device.id
+    )
+    garaged = entities.async_get_or_create("sensor", "zha", "garaged")
+    entities.async_update_entity(garaged.entity_id, area_id=garage.id)
+    ids = [direct.entity_id, by_device.entity_id, garaged.entity_id, "sensor.loose"]
+
+    assert EntityFilter({"include_area": ["kitchen"]}).filter(hass, ids) == [
+        direct.entity_id,
+        by_device.entity_id,
+    ]
+    assert EntityFilter({"include_integration": ["zha"]}).filter(hass, ids) == [
+        by_device.entity_id,
+        garaged.entity_id,
+    ]
+    assert EntityFilter({"exclude_integration": ["mqtt"]}).filter(hass, ids) == [
+        by_device.entity_id,
+        garaged.entity_id,
+        "sensor.loose",
+    ]
+
+
+async def test_upload_set_is_cached_until_a_change(hass: HomeAssistant) -> None:
+    """Test the upload set follows added and removed entities and areas."""
+    registry = er.async_get(hass)
+    pump = registry.async_get_or_create(
+        "switch", "demo", "pump", suggested_object_id="pump"
+    )
+    _set_states(hass)
+    upload = UploadSet(hass, EntityFilter({"exclude_area": ["garage"]}))
+    unsubscribe = upload.async_setup()
+    entities = upload.entities
+    assert sorted(entities) == [
+        "sensor.kitchen_hum",
+        "sensor.kitchen_temp",
+        "sensor.outdoor_temp",
+        "switch.pump",
+    ]
+
+    hass.states.async_set("sensor.kitchen_temp", "22", {"device_class": "temperature"})
+    hass.states.async_set("climate.room", "heat")
+    await hass.async_block_till_done()
+    assert upload.entities is entities
+
+    hass.states.async_set("light.porch", "on")
+    await hass.async_block_till_done()
+    assert "light.porch" in upload.entities
+
+    hass.states.async_remove("light.porch")
+    await hass.async_block_till_done()
+    assert "light.porch" not in upload.entities
+
+    garage = ar.async_get(hass).async_create("Garage")
+    registry.async_update_entity(pump.entity_id, area_id=garage.id)
+    await hass.async_block_till_done()
+    assert "switch.pump" not in upload.entities
+
+    unsubscribe()
+    hass.states.async_set("light.porch", "on")
+    await hass.async_block_till_done()
+    assert "light.porch" not in upload.entities
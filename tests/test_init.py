@@ -0,0 +1,150 @@
+"""Tests for the BZUTech services."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.test_util.aiohttp import (
+    AiohttpClientMocker,
+)
+import voluptuous as vol
+
+from custom_components.bzutech.api import API_URL, BzuTechClient
+from custom_components.bzutech.const import (
+    CONF_CHIPID,
+    CONF_SENSORPORT,
+    CONF_TARGETS,
+    CONF_TYPE,
+    DATA_CLIENTS,
+    DOMAIN,
+)
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.setup import async_setup_component
+
+from .conftest import CHIPID
+
+
+async def test_provision_uses_stored_credentials(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    """Test provisioning reuses the password of the entry of the account."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_TYPE: "0",
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "secret",
+            CONF_CHIPID: CHIPID,
+            CONF_SENSORPORT: "1",
+        },
+    ).add_to_hass(hass)
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with (
+        patch(
+            "custom_components.bzutech.async_get_client", return_value=AsyncMock()
+        ) as get_client,
+        patch(
+            "custom_components.bzutech.resolve_targets",
+            return_value=([(CHIPID, "2", "EP101")], []),
+        ),
+        patch("custom_components.bzutech.async_import_ports") as import_ports,
+    ):
+        await hass.services.async_call(
+            DOMAIN,
+            "provision",
+            {CONF_EMAIL: "user@example.com", CONF_TARGETS: [f"{CHIPID}:2"]},
+            blocking=True,
+        )
+
+    get_client.assert_awaited_once_with(hass, "user@example.com", "secret")
+    [entry] = import_ports.call_args.args[1]
+    assert entry[CONF_PASSWORD] == "secret"
+    assert entry[CONF_SENSORPORT] == "2"
+
+
+async def test_provision_rejects_unknown_account_and_password(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    """Test provisioning needs an account set up and takes no password."""
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            "provision",
+            {CONF_EMAIL: "user@example.com", CONF_TARGETS: [f"{CHIPID}:2"]},
+            blocking=True,
+        )
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            "provision",
+            {
+                CONF_EMAIL: "user@example.com",
+                CONF_PASSWORD: "secret",
+                CONF_TARGETS: [f"{CHIPID}:2"],
+            },
+            blocking=True,
+        )
+
+
+async def test_provision_discovers_new_gateways(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    aioclient_mock: AiohttpClientMocker,
+) -> None:
+    """Test a gateway added to the cloud after the client started is found."""
+    MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_TYPE: "0",
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "secret",
+            CONF_CHIPID: CHIPID,
+            CONF_SENSORPORT: "1",
+        },
+    ).add_to_hass(hass)
+    client = BzuTechClient(
+        async_get_clientsession(hass), "user@example.com", "secret"
+    )
+    client._contratoid = 9
+    client.dispositivos = {}
+    hass.data[DATA_CLIENTS] = {"user@example.com": client}
+    aioclient_mock.get(
+        f"{API_URL}/dispositivos/listar/9",
+        json=[
+            {
+                "status_dispositivo": 1,
+                "boot_chip_id": "7654321",
+                "dispname": None,
+                "dispnum": "2",
+            }
+        ],
+    )
+    aioclient_mock.get(
+        f"{API_URL}/dispositivos/canais-list/7654321",
+        json=[
+            {
+                "sensor_nome": "sht30-tmp-2",
+                "apelido_canal": "Sala",
+                "ultima_medicao_sensor": 1,
+            }
+        ],
+    )
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with patch("custom_components.bzutech.async_import_ports") as import_ports:
+        await hass.services.async_call(
+            DOMAIN,
+            "provision",
+            {CONF_EMAIL: "user@example.com", CONF_TARGETS: ["7654321:2"]},
+            blocking=True,
+        )
+
+    [entry] = import_ports.call_args.args[1]
+    assert (entry[CONF_CHIPID], entry[CONF_SENSORPORT]) == ("7654321", "2")
+    assert "7654321" in client.dispositivos
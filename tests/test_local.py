@@ -0,0 +1,105 @@
+"""Tests for the LAN transport and its cloud fallback."""
+
+from unittest.mock import AsyncMock, patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.bzutech.const import CONF_CHIPID, CONF_SENSORPORT, DOMAIN
+from custom_components.bzutech.coordinator import BzuCoordinator
+from custom_components.bzutech.local import LOCAL_RETRY, BzuLocal
+from custom_components.bzutech.sensor import ENDPOINT_SENSORS
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .conftest import CHIPID
+
+CHANNELS = [f"{sensor}-1" for sensor in ENDPOINT_SENSORS["EP101"]]
+
+
+def create_coordinator(
+    hass: HomeAssistant, host: str, channels: list[str], api: AsyncMock
+) -> BzuCoordinator:
+    """Create the coordinator of port 1 reading the gateway at ``host``."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={CONF_CHIPID: CHIPID, CONF_SENSORPORT: "1"},
+        options={CONF_HOST: host},
+    )
+    entry.add_to_hass(hass)
+    return BzuCoordinator(hass, api, entry, channels)
+
+
+async def test_local_readings(hass: HomeAssistant, gateway) -> None:
+    """Test the channels of a port are read from the gateway."""
+    local = BzuLocal(async_get_clientsession(hass), await gateway(), CHIPID)
+
+    readings = await local.async_get_readings("1")
+
+    assert readings is not None
+    assert set(readings) == set(CHANNELS)
+    assert local.available
+
+
+async def test_local_chipid_mismatch(hass: HomeAssistant, gateway) -> None:
+    """Test a gateway answering with another chip id is not used."""
+    local = BzuLocal(
+        async_get_clientsession(hass), await gateway(chipid="7654321"), CHIPID
+    )
+
+    assert await local.async_get_readings("1") is None
+    assert not local.available
+
+
+async def test_local_retry_backoff(hass: HomeAssistant, gateway) -> None:
+    """Test an unreachable gateway is skipped for LOCAL_RETRY seconds."""
+    local = BzuLocal(async_get_clientsession(hass), await gateway(fail=True), CHIPID)
+
+    with patch("custom_components.bzutech.local.time.monotonic", return_value=1000):
+        assert await local.async_get_readings("1") is None
+        assert not local.available
+    with patch(
+        "custom_components.bzutech.local.time.monotonic",
+        return_value=1000 + LOCAL_RETRY - 1,
+    ):
+        assert not local.available
+    with patch(
+        "custom_components.bzutech.local.time.monotonic",
+        return_value=1000 + LOCAL_RETRY,
+    ):
+        assert local.available
+
+
+async def test_cloud_reads_missing_channels(hass: HomeAssistant, gateway) -> None:
+    """Test only the channels the gateway does not return go to the cloud."""
+    api = AsyncMock()
+    api.get_reading.return_value = -60.0
+    coordinator = create_coordinator(
+        hass, await gateway(), [*CHANNELS, "GATEWAY-DBM-1"], api
+    )
+
+    await coordinator.async_refresh()
+
+    api.get_reading.assert_awaited_once_with(CHIPID, "GATEWAY-DBM-1")
+    assert coordinator.data["GATEWAY-DBM-1"] == -60.0
+    assert all(coordinator.data[name] is not None for name in CHANNELS)
+
+
+async def test_cloud_fallback(hass: HomeAssistant, gateway) -> None:
+    """Test every channel comes from the cloud while the gateway is down."""
+    api = AsyncMock()
+    api.get_reading.return_value = 20.0
+    coordinator = create_coordinator(hass, await gateway(fail=True), CHANNELS, api)
+
+    await coordinator.async_refresh()
+
+    assert coordinator.last_update_success
+    assert api.get_reading.await_count == len(CHANNELS)
+    assert coordinator.data == dict.fromkeys(CHANNELS, 20.0)
+    assert coordinator.local is not None
+    assert not coordinator.local.available
+
+    with patch.object(coordinator.local, "async_get_readings") as get_readings:
+        await coordinator.async_refresh()
+    get_readings.assert_not_called()
+    assert api.get_reading.await_count == 2 * len(CHANNELS)
@@ -0,0 +1,77 @@
+"""Tests for the prioritized outbound queue."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import voluptuous as vol
+
+from custom_components.bzutech.const import DOMAIN
+from custom_components.bzutech.outbound import (
+    LANE_ALERT,
+    LANE_BULK,
+    LANE_MANIFEST,
+    OutboundQueue,
+)
+from homeassistant.core import HomeAssistant
+from homeassistant.setup import async_setup_component
+
+
+async def test_alert_first_and_errors_keep_draining(hass: HomeAssistant) -> None:
+    """Test lanes drain by priority and a failing publish does not stop the task."""
+    publish = AsyncMock(side_effect=[ValueError("bad topic"), None, None, None])
+    outbound = OutboundQueue(hass)
+    with patch("custom_components.bzutech.outbound.mqtt.async_publish", publish):
+        outbound.lanes[LANE_BULK].append("data_send", "snapshot")
+        outbound.lanes[LANE_MANIFEST].append("UpdateChannels", "delta")
+        outbound.lanes[LANE_ALERT].append("ha_alert_action/#", "broken")
+        outbound.publish(LANE_ALERT, "ha_alert_action/1", "alert")
+        await hass.async_block_till_done()
+
+    assert [call.args[1:] for call in publish.await_args_list] == [
+        ("ha_alert_action/#", "broken", 1),
+        ("ha_alert_action/1", "alert", 1),
+        ("UpdateChannels", "delta", 1),
+        ("data_send", "snapshot", 0),
+    ]
+
+
+async def test_only_bulk_drops(hass: HomeAssistant) -> None:
+    """Test a full bulk lane drops snapshots while manifest updates are kept."""
+    outbound = OutboundQueue(hass)
+    for index in range(150):
+        outbound.lanes[LANE_BULK].append("data_send", index)
+        outbound.lanes[LANE_MANIFEST].append("UpdateChannels", index)
+
+    assert len(outbound.lanes[LANE_BULK].queue) == 100
+    assert len(outbound.lanes[LANE_MANIFEST].queue) == 150
+
+
+async def test_finished_task_is_restarted(hass: HomeAssistant) -> None:
+    """Test a message is still published after the drain task ended."""
+    publish = AsyncMock()
+    outbound = OutboundQueue(hass)
+    with patch("custom_components.bzutech.outbound.mqtt.async_publish", publish):
+        outbound.publish(LANE_ALERT, "ha_alert_action/1", "first")
+        await hass.async_block_till_done()
+        outbound._task.cancel()
+        await hass.async_block_till_done()
+
+        outbound.publish(LANE_ALERT, "ha_alert_action/1", "second")
+        await hass.async_block_till_done()
+
+    assert [call.args[2] for call in publish.await_args_list] == ["first", "second"]
+
+
+async def test_alert_service_rejects_wildcard_topic(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    """Test the alert service validates its topic before queueing it."""
+    assert await async_setup_component(hass, DOMAIN, {})
+
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(
+            DOMAIN,
+            "alert",
+            {"topic": "ha_alert_action/#", "payload": "alert"},
+            blocking=True,
+        )
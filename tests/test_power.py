@@ -0,0 +1,41 @@
+"""Tests for the EP400 derived power."""
+
+import pytest
+
+from custom_components.bzutech.power import PowerEngine
+
+
+def test_power_and_energy() -> None:
+    """Test the power of each phase and the energy between two refreshes."""
+    engine = PowerEngine(power_factor=0.8)
+
+    values = engine.compute([100.0, 200.0, 250.0], [10.0, 5.0, 2.0], now=1000.0)
+
+    assert values == {
+        "APA": 1000.0,
+        "PPA": 800.0,
+        "RPA": 600.0,
+        "ENA": 0.0,
+        "APB": 1000.0,
+        "PPB": 800.0,
+        "RPB": 600.0,
+        "ENB": 0.0,
+        "APC": 500.0,
+        "PPC": 400.0,
+        "RPC": 300.0,
+        "ENC": 0.0,
+        "APT": 2500.0,
+        "PPT": 2000.0,
+        "RPT": 1500.0,
+        "ENT": 0.0,
+    }
+
+    # Half an hour later phase A doubled its current.
+    values = engine.compute([100.0, 200.0, 250.0], [20.0, 5.0, 2.0], now=2800.0)
+
+    assert values["PPA"] == 1600.0
+    assert values["PPT"] == 2800.0
+    assert values["ENA"] == pytest.approx(0.6)
+    assert values["ENB"] == pytest.approx(0.4)
+    assert values["ENC"] == pytest.approx(0.2)
+    assert values["ENT"] == pytest.approx(1.2)
@@ -0,0 +1,28 @@
+"""Tests for the integration profiler."""
+
+from pathlib import Path
+
+from custom_components.bzutech.profiler import (
+    FORMAT_COLLAPSED,
+    FORMAT_PSTATS,
+    Profiler,
+)
+
+
+def test_collapsed_after_unfinished_pstats(tmp_path: Path) -> None:
+    """Test a pstats run never written does not leak into the next profile."""
+    profiler = Profiler()
+    profiler.start(FORMAT_PSTATS)
+    profiler.stop()
+
+    profiler.start(FORMAT_COLLAPSED)
+    with profiler.span("push.cycle"), profiler.span("push.scan"):
+        pass
+    profiler.stop()
+    profiler.write(str(tmp_path / "profile.txt"))
+
+    lines = (tmp_path / "profile.txt").read_text(encoding="utf-8").splitlines()
+    assert [line.rsplit(" ", 1)[0] for line in lines] == [
+        "push.cycle",
+        "push.cycle;push.scan",
+    ]
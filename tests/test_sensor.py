@@ -0,0 +1,200 @@
+"""Tests for the gateway port sensors."""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from freezegun.api import FrozenDateTimeFactory
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+    mock_restore_cache_with_extra_data,
+)
+
+from custom_components.bzutech.const import (
+    CONF_CHIPID,
+    CONF_DERIVEDPOWER,
+    CONF_ENDPOINT,
+    CONF_HOURLY,
+    CONF_POLLINTERVAL,
+    CONF_POWERFACTOR,
+    CONF_SENSORPORT,
+    CONF_TYPE,
+    DOMAIN,
+)
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, EntityCategory
+from homeassistant.core import HomeAssistant, State
+from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
+
+from .conftest import CHIPID
+
+ENERGY = {"ENA": 10.0, "ENB": 20.0, "ENC": 30.0, "ENT": 60.0}
+
+
+async def test_ep400_energy_is_restored(
+    hass: HomeAssistant, enable_custom_integrations: None
+) -> None:
+    """Test the EP400 energy totals continue from their value before a restart."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_TYPE: "0",
+            CONF_ENDPOINT: "EP400",
+            CONF_SENSORPORT: "1",
+            CONF_CHIPID: CHIPID,
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "secret",
+            CONF_DERIVEDPOWER: True,
+            CONF_POWERFACTOR: 0.9,
+        },
+    )
+    entry.add_to_hass(hass)
+    registry = er.async_get(hass)
+    for key in ENERGY:
+        registry.async_get_or_create(
+            "sensor",
+            DOMAIN,
+            f"{CHIPID}{key}1",
+            suggested_object_id=key.lower(),
+            config_entry=entry,
+        )
+    mock_restore_cache_with_extra_data(
+        hass,
+        [
+            (
+                State(f"sensor.{key.lower()}", str(value)),
+                {"native_value": value, "native_unit_of_measurement": "kWh"},
+            )
+            for key, value in ENERGY.items()
+        ],
+    )
+
+    api = AsyncMock()
+    api.dispositivos = {}
+    api.get_reading.side_effect = lambda chipid, name: (
+        127.0 if "-VR" in name else 5.0
+    )
+    with patch("custom_components.bzutech.async_get_client", return_value=api):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+        for key, value in ENERGY.items():
+            assert float(hass.states.get(f"sensor.{key.lower()}").state) == value
+        assert registry.async_get_entity_id("sensor", DOMAIN, f"{CHIPID}PFT1") is None
+
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=301))
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    for key, value in ENERGY.items():
+        assert float(hass.states.get(f"sensor.{key.lower()}").state) >= value
+    assert api.get_reading.await_count == 12
+
+
+async def test_gateway_diagnostics_and_hourly_option(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test gateway channels listed on the port and the hourly channel choices."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_TYPE: "0",
+            CONF_ENDPOINT: "EP111",
+            CONF_SENSORPORT: "1",
+            CONF_CHIPID: CHIPID,
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "secret",
+        },
+    )
+    entry.add_to_hass(hass)
+    api = AsyncMock()
+    api.dispositivos = {
+        CHIPID: SimpleNamespace(
+            sensores={"GATEWAY-UPT-1": None, "GATEWAY-DBM-1": None}
+        )
+    }
+    api.get_reading.return_value = 60000.0
+    with patch("custom_components.bzutech.async_get_client", return_value=api):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    registry = er.async_get(hass)
+    upt = registry.async_get(
+        registry.async_get_entity_id("sensor", DOMAIN, f"{CHIPID}UPT1")
+    )
+    dbm = registry.async_get(
+        registry.async_get_entity_id("sensor", DOMAIN, f"{CHIPID}DBM1")
+    )
+    assert upt.entity_category is EntityCategory.DIAGNOSTIC
+    assert upt.disabled_by is None
+    boot = dt_util.parse_datetime(hass.states.get(upt.entity_id).state)
+    assert abs(dt_util.utcnow() - timedelta(minutes=1) - boot) < timedelta(seconds=5)
+    assert dbm.disabled_by is er.RegistryEntryDisabler.INTEGRATION
+    assert registry.async_get_entity_id("sensor", DOMAIN, f"{CHIPID}MEM1") is None
+
+    result = await hass.config_entries.options.async_init(entry.entry_id)
+    selector = result["data_schema"].schema[CONF_HOURLY]
+    assert [option["value"] for option in selector.config["options"]] == [
+        "SHT20-TMP-1",
+        "SHT20-HUM-1",
+        "BH1750-LUM-1",
+        "SHT30-TMP-1",
+        "SHT30-HUM-1",
+        "GATEWAY-DBM-1",
+        "GATEWAY-UPT-1",
+    ]
+
+    # Saving the options refreshes right away, writing the first hourly state.
+    api.get_reading.return_value = 21.0
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_HOURLY: ["SHT20-TMP-1"]}
+    )
+    await hass.async_block_till_done(wait_background_tasks=True)
+    temperature = registry.async_get_entity_id("sensor", DOMAIN, f"{CHIPID}TMP1")
+    humidity = registry.async_get_entity_id("sensor", DOMAIN, f"{CHIPID}HUM1")
+    api.get_reading.return_value = 22.0
+    freezer.tick(timedelta(minutes=6))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert hass.states.get(temperature).state == "21.0"
+    assert hass.states.get(humidity).state == "22.0"
+
+
+async def test_poll_interval_option_reschedules(
+    hass: HomeAssistant,
+    enable_custom_integrations: None,
+    freezer: FrozenDateTimeFactory,
+) -> None:
+    """Test a new poll interval replaces the refresh set with the old one."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_TYPE: "0",
+            CONF_ENDPOINT: "EP121",
+            CONF_SENSORPORT: "1",
+            CONF_CHIPID: CHIPID,
+            CONF_EMAIL: "user@example.com",
+            CONF_PASSWORD: "secret",
+        },
+        options={CONF_POLLINTERVAL: 3600},
+    )
+    entry.add_to_hass(hass)
+    api = AsyncMock()
+    api.dispositivos = {}
+    api.get_reading.return_value = 1.0
+    with patch("custom_components.bzutech.async_get_client", return_value=api):
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+    calls = api.get_reading.await_count
+
+    hass.config_entries.async_update_entry(entry, options={CONF_POLLINTERVAL: 60})
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert api.get_reading.await_count == 2 * calls
+
+    freezer.tick(timedelta(seconds=61))
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done(wait_background_tasks=True)
+    assert api.get_reading.await_count == 3 * calls